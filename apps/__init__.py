@@ -7,65 +7,112 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_jwt_extended.exceptions import NoAuthorizationError
 from flask_marshmallow import Marshmallow
-from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 from jwt import InvalidTokenError
 
 from apps.config import config_mapping
+from apps.core.compression import Compress
+from apps.core.metrics import Metrics
+from apps.core.queries import QueryTracker
+from apps.core.startup import StartupTimer, is_cli_command, startup_profile
 from apps.core.error_handlers import invalid_auth_header, invalid_token
+from apps.core.green import (
+    get_session_scope, is_gevent_patched, make_psycopg2_green,
+)
 from apps.logs import setup_logs
 
-db = SQLAlchemy()
-migrate = Migrate()
+db = SQLAlchemy(session_options={"scopefunc": get_session_scope})
 ma = Marshmallow()
 jwt = JWTManager()
+compress = Compress()
+metrics = Metrics()
+query_tracker = QueryTracker()
 
 # CLI groups
 superuser_cli = AppGroup("superuser", short_help="Operations with superusers.")
+users_cli = AppGroup("users", short_help="Operations with users.")
+spec_cli = AppGroup("spec", short_help="Operations with OpenAPI spec.")
+loadtest_cli = AppGroup("loadtest", short_help="Recorded traffic replay.")
 
 from apps.users import models, commands
+from apps.core.spec import PrecomputedSpec
+from apps.core.traffic import TrafficRecorder
 
 
 def create_app(app_config=None):
     if not app_config:
         app_config = config_mapping[os.getenv("ENV")]
 
+    timer = StartupTimer()
+
     # init app
-    app = Flask(__name__)
+    with timer.phase("app"):
+        app = Flask(__name__)
 
-    # config app
-    app.config.from_object(app_config)
+        # config app
+        app.config.from_object(app_config)
+        app.extensions["startup_timer"] = timer
 
     if not app.config.get("ENV") == "testing":
-        setup_logs(app)
+        with timer.phase("logs"):
+            setup_logs(app)
+
+    # init db, psycopg2 waits for queries in gevent hub
+    with timer.phase("db"):
+        if app.config.get("DATABASE_GREEN") and is_gevent_patched():
+            make_psycopg2_green()
+        db.init_app(app)
+
+        # init SQL statements stats
+        query_tracker.init_app(app)
+
+    # init migrations only for `flask db` commands
+    if is_cli_command("db"):
+        with timer.phase("migrate"):
+            from flask_migrate import Migrate
+            Migrate(app, db)
+
+    with timer.phase("extensions"):
+        # init marshmallow
+        ma.init_app(app)
 
-    # init db
-    db.init_app(app)
+        # init CORS
+        CORS(app, supports_credentials=True)
 
-    # init migrations
-    migrate.init_app(app, db)
+        # init JWT
+        jwt.init_app(app)
 
-    # init marshmallow
-    ma.init_app(app)
+        # serve spec built by `flask spec build` from memory,
+        # its url is registered before flasgger one
+        PrecomputedSpec.init_app(app)
 
-    # init CORS
-    CORS(app, supports_credentials=True)
+        # init Swagger (Flasgger), spec is built by docs requests
+        Swagger(app, template=app.config.get("SWAGGER_TEMPLATE"))
 
-    # init JWT
-    jwt.init_app(app)
+        # init requests metrics, before compression to count sent bytes
+        metrics.init_app(app)
 
-    # init Swagger (Flasgger)
-    Swagger(app, template=app.config.get("SWAGGER_TEMPLATE"))
+        # init responses compression
+        compress.init_app(app)
 
     # init API
-    from apps.api.v1 import api_v1_bp
-    app.register_blueprint(api_v1_bp)
+    with timer.phase("api"):
+        from apps.api.v1 import api_v1_bp
+        app.register_blueprint(api_v1_bp)
 
-    # import JWT callback
-    from apps.core.jwt import user_loader_callback
+        # import JWT callback
+        from apps.core.jwt import user_loader_callback
 
     # add CLI commands
     app.cli.add_command(superuser_cli)
+    app.cli.add_command(users_cli)
+    app.cli.add_command(startup_profile)
+    app.cli.add_command(spec_cli)
+    app.cli.add_command(loadtest_cli)
+
+    # record sanitized requests for `flask loadtest replay`
+    if app.config.get("TRAFFIC_RECORD_FILE"):
+        app.wsgi_app = TrafficRecorder(app)
 
     # register app error handlers
     app.register_error_handler(NoAuthorizationError, invalid_auth_header)
@@ -1,7 +1,20 @@
 from flask import Blueprint
 from flask_restful import Api
 
+from apps.core.constants import APPLICATION_MSGPACK
+from apps.core.representations import output_msgpack
+
 api_v1_bp = Blueprint("api_v1", __name__, url_prefix="/api/v1")
 app_api_v1 = Api(api_v1_bp)
+app_api_v1.representation(APPLICATION_MSGPACK)(output_msgpack)
+
+
+@api_v1_bp.after_request
+def vary_accept(response):
+    """ Response body format depends on Accept header. """
+
+    response.vary.add("Accept")
+    return response
+
 
 from .urls import *  # noqa
@@ -1,13 +1,16 @@
 from flask import request
 from flask_jwt_extended import create_access_token, current_user
 
+from apps.core.constants import EMPTY_PAYLOAD
 from apps.core.resources import BaseResource, IdValidationMixin
 from apps.users.constants import USERS_NOT_FOUND, USER_NOT_FOUND, \
-    DELETE_YOURSELF_VALIDATION, USER_WAS_DELETED
+    DELETE_YOURSELF_VALIDATION, USER_WAS_DELETED, USER_WAS_UPDATED, \
+    INVALID_LOGIN
 from apps.users.models import User
 from apps.users.schemes import (
     UserLoginSchema, UserSchema, UserRegistrationSchema,
-    AuthTokenSchema, UserUpdateSchema,
+    AuthTokenSchema, UserUpdateSchema, UsersBulkUpdateSchema,
+    UsersBulkDeleteSchema,
 )
 
 
@@ -39,21 +42,19 @@ class UserLoginResource(BaseResource):
     def post(self):
         """ User sign in. """
 
-        errors = self.serializer().validate(self.data)
+        # one query for user credentials and one hash check
+        serializer = self.serializer()
+        errors = serializer.validate(self.data)
+        user_id = serializer.context.get("user_id")
 
-        if errors:
-            return self.make_response(status_code=400, message=errors)
-
-        user = User.query.filter_by(login=self.data.get("login")).first()
-
-        if not user:
+        if errors or user_id is None:
             return self.make_response(
                 status_code=400,
-                message="User not exist.",
+                message=errors or {"_schema": [INVALID_LOGIN]},
             )
 
         response = {
-            "access_token": create_access_token(identity=user.id),
+            "access_token": create_access_token(identity=user_id),
         }
 
         return response
@@ -123,6 +124,14 @@ class UsersListResource(BaseResource):
     serializer = UserSchema
     tags = ["Users"]
     model = User
+    response_cache = True
+    filter_fields = {
+        "is_active": ("is_active", "eq"),
+        "is_admin": ("is_admin", "eq"),
+        "created_after": ("created_at", "gt"),
+        "created_before": ("created_at", "lt"),
+    }
+    sort_fields = ("id", "login", "created_at")
 
     def get(self):
         """
@@ -143,6 +152,64 @@ class UsersListResource(BaseResource):
             schema:
               type: int
             description: Results page limit.
+          - in: query
+            name: count
+            type: string
+            required: false
+            schema:
+              type: string
+              enum: [exact, estimated, none]
+            description: Total count mode for page pagination,
+                returned in X-Total-Count header.
+          - in: query
+            name: after
+            type: string
+            required: false
+            schema:
+              type: string
+            description: Cursor of the previous page, returned in
+                X-Next-Cursor header. Used when page isn't passed.
+          - in: query
+            name: is_active
+            type: boolean
+            required: false
+            description: Filter by active status.
+          - in: query
+            name: is_admin
+            type: boolean
+            required: false
+            description: Filter by admin status.
+          - in: query
+            name: created_after
+            type: string
+            format: date-time
+            required: false
+            description: Filter users created after date.
+          - in: query
+            name: created_before
+            type: string
+            format: date-time
+            required: false
+            description: Filter users created before date.
+          - in: query
+            name: sort
+            type: string
+            required: false
+            description: Sort field (id, login or created_at),
+                prefixed by minus for descending order.
+          - in: query
+            name: fields
+            type: string
+            required: false
+            description: Comma separated response fields, e.g. id,login.
+          - in: query
+            name: stream
+            type: int
+            required: false
+            schema:
+              type: int
+            description: Stream all results as JSON array if 1.
+                Use Accept application/x-ndjson header to get NDJSON.
         definitions:
           UsersListSchema:
             type: array
@@ -155,6 +222,11 @@ class UsersListResource(BaseResource):
                 $ref: '#/definitions/UsersListSchema'
         """
 
+        errors = self.parse_fields()
+
+        if errors:
+            return self.make_response(status_code=400, message=errors)
+
         response = self.get_list(
             parsed_args=request.args,
             error=USERS_NOT_FOUND,
@@ -163,6 +235,166 @@ class UsersListResource(BaseResource):
 
         return response
 
+    def get_bulk_results(self, ids, message):
+        """
+        Resolve bulk operation targets by ids.
+        :param list ids: requested ids
+        :param str message: message for found users
+        :return: found ids and per id results
+        :rtype: tuple
+        """
+
+        found = self.get_bulk_ids(ids)
+        results = {
+            resource_id: {"id": resource_id, "status": 200, "message": message}
+            if resource_id in found else
+            {"id": resource_id, "status": 404, "message": USER_NOT_FOUND}
+            for resource_id in ids
+        }
+
+        return found, results
+
+    def patch(self):
+        """
+        Update users found by ids or filter with one query.
+        ---
+        parameters:
+          - in: body
+            name: body
+            required: True
+            schema:
+              $ref: '#/definitions/UsersBulkUpdate'
+        definitions:
+          UsersFilter:
+            type: object
+            properties:
+              is_active:
+                type: boolean
+              is_admin:
+                type: boolean
+          UsersBulkUpdate:
+            type: object
+            properties:
+              ids:
+                type: array
+                items:
+                  type: integer
+              filter:
+                $ref: '#/definitions/UsersFilter'
+              data:
+                type: object
+                properties:
+                  name:
+                    type: string
+                  is_active:
+                    type: boolean
+                  is_admin:
+                    type: boolean
+          UsersBulkResults:
+            type: object
+            description: Per id results, only rejected ids for filter.
+            properties:
+              count:
+                type: integer
+              results:
+                type: array
+                items:
+                  type: object
+                  properties:
+                    id:
+                      type: integer
+                    status:
+                      type: integer
+                    message:
+                      type: string
+        responses:
+          200:
+            description: OK
+            schema:
+              $ref: '#/definitions/UsersBulkResults'
+        """
+
+        payload, errors = UsersBulkUpdateSchema().load(self.data)
+
+        if errors:
+            return self.make_response(status_code=400, message=errors)
+
+        data = payload["data"]
+
+        if payload.get("filter"):
+            count = self.model.bulk_update(
+                data, *self.get_bulk_criteria(payload["filter"]),
+            )
+            return {"count": count, "results": []}
+
+        found, results = self.get_bulk_results(
+            payload["ids"], USER_WAS_UPDATED,
+        )
+        count = self.model.bulk_update(data, self.model.id.in_(found)) \
+            if found else 0
+
+        return {"count": count, "results": list(results.values())}
+
+    def delete(self):
+        """
+        Delete users found by ids or filter with one query.
+        ---
+        parameters:
+          - in: body
+            name: body
+            required: True
+            schema:
+              type: object
+              properties:
+                ids:
+                  type: array
+                  items:
+                    type: integer
+                filter:
+                  $ref: '#/definitions/UsersFilter'
+        responses:
+          200:
+            description: OK
+            schema:
+              $ref: '#/definitions/UsersBulkResults'
+        """
+
+        if not self.data:
+            return self.make_response(status_code=400, message=EMPTY_PAYLOAD)
+
+        payload, errors = UsersBulkDeleteSchema().load(self.data)
+
+        if errors:
+            return self.make_response(status_code=400, message=errors)
+
+        filters = payload.get("filter")
+
+        if filters:
+            criteria = self.get_bulk_criteria(filters)
+            # matched rows aren't loaded, only skipped current user
+            # is reported
+            results = {
+                current_user.id: {"id": current_user.id},
+            } if all(getattr(current_user, field) == value
+                     for field, value in filters.items()) else {}
+        else:
+            found, results = self.get_bulk_results(
+                payload["ids"], USER_WAS_DELETED,
+            )
+            criteria = [self.model.id.in_(found)] if found else None
+
+        if current_user.id in results:
+            results[current_user.id].update(
+                status=400,
+                message=DELETE_YOURSELF_VALIDATION,
+            )
+
+        count = self.model.bulk_delete(
+            self.model.id != current_user.id, *criteria,
+        ) if criteria else 0
+
+        return {"count": count, "results": list(results.values())}
+
 
 class UserResource(IdValidationMixin, BaseResource):
     """ User resource. """
@@ -179,6 +411,12 @@ class UserResource(IdValidationMixin, BaseResource):
         """
         Get user profile.
         ---
+        parameters:
+          - in: query
+            name: fields
+            type: string
+            required: false
+            description: Comma separated response fields, e.g. id,login.
         responses:
           200:
             description: OK
@@ -186,7 +424,12 @@ class UserResource(IdValidationMixin, BaseResource):
                 $ref: '#/definitions/UserSchema'
         """
 
-        user = self.model.query.get(resource_id)
+        errors = self.parse_fields()
+
+        if errors:
+            return self.make_response(status_code=400, message=errors)
+
+        user = self.model.get_cached(resource_id)
 
         if not user:
             return self.make_response(message="User not found.")
@@ -211,6 +454,7 @@ class UserResource(IdValidationMixin, BaseResource):
               $ref: '#/definitions/UserSchema'
         """
 
+        # cached copy may be stale after write in other worker
         user = self.model.query.get(resource_id)
 
         if not user:
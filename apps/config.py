@@ -35,21 +35,93 @@ class Config(object):
         })
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # per request SQL statements stats and slow statements log
+    QUERY_STATS_ENABLED = (os.getenv("QUERY_STATS_ENABLED") or "1") == "1"
+    QUERY_STATS_HEADERS = True
+    SLOW_QUERY_THRESHOLD_MS = int(os.getenv("SLOW_QUERY_THRESHOLD_MS") or 100)
+    # same statement executed this many times by request is logged as N+1
+    N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD") or 5)
+
+    # models read-through cache, zero size disables it
+    MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE") or 1024)
+    MODEL_CACHE_TTL = int(os.getenv("MODEL_CACHE_TTL") or 60)
+    # log cache stats every N lookups
+    MODEL_CACHE_LOG_INTERVAL = int(
+        os.getenv("MODEL_CACHE_LOG_INTERVAL") or 1000,
+    )
+
+    # list endpoints response cache, zero size disables it
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE") or 256)
+    RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL") or 60)
+    RESPONSE_CACHE_MAX_BYTES = int(
+        os.getenv("RESPONSE_CACHE_MAX_BYTES") or 16 * 1024 * 1024,
+    )
+    # log cache stats every N lookups
+    RESPONSE_CACHE_LOG_INTERVAL = int(
+        os.getenv("RESPONSE_CACHE_LOG_INTERVAL") or 1000,
+    )
+
+    # native threads for password hashing under gevent, zero disables
+    HASH_POOL_SIZE = int(os.getenv("HASH_POOL_SIZE") or os.cpu_count() or 1)
+
+    # responses compression, gzip level is 1-9, brotli 0-11, zstd 1-22
+    COMPRESS_ENABLED = (os.getenv("COMPRESS_ENABLED") or "1") == "1"
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE") or 500)
+    COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL") or 6)
+    COMPRESS_BROTLI_LEVEL = int(os.getenv("COMPRESS_BROTLI_LEVEL") or 4)
+    COMPRESS_ZSTD_LEVEL = int(os.getenv("COMPRESS_ZSTD_LEVEL") or 3)
+    # precompressed Swagger and static payloads cache
+    COMPRESS_CACHE_SIZE = int(os.getenv("COMPRESS_CACHE_SIZE") or 64)
+    COMPRESS_CACHE_TTL = int(os.getenv("COMPRESS_CACHE_TTL") or 3600)
+    COMPRESS_CACHE_MAX_BYTES = int(
+        os.getenv("COMPRESS_CACHE_MAX_BYTES") or 8 * 1024 * 1024,
+    )
+
+    # requests metrics in Prometheus format, multiprocess mode
+    # is enabled by prometheus_multiproc_dir env variable
+    METRICS_ENABLED = (os.getenv("METRICS_ENABLED") or "1") == "1"
+    METRICS_URL = os.getenv("METRICS_URL") or "/metrics"
+
+    # opt-in sanitized requests recording to JSONL file
+    TRAFFIC_RECORD_FILE = os.getenv("TRAFFIC_RECORD_FILE")
+    TRAFFIC_RECORD_SAMPLE_RATE = float(
+        os.getenv("TRAFFIC_RECORD_SAMPLE_RATE") or 1.0,
+    )
+
     # logging
     APP_LOGDIR = os.getenv("APP_LOGDIR")
     APP_LOGFILE = os.getenv("APP_LOGFILE")
+    APP_SLOW_QUERY_LOGFILE = os.getenv("APP_SLOW_QUERY_LOGFILE")
+    LOG_LEVEL = os.getenv("LOG_LEVEL") or "INFO"
+    # records are dropped when queue of background writer is full
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE") or 10000)
+    # part of INFO and DEBUG records which are written, from 0 to 1
+    LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE") or 1.0)
 
     # API version
     API_VERSION = os.getenv("API_VERSION", 1)
     ERROR_404_HELP = False
 
+    # list endpoints page size
+    API_PAGE_LIMIT_DEFAULT = int(os.getenv("API_PAGE_LIMIT_DEFAULT") or 50)
+    API_PAGE_LIMIT_MAX = int(os.getenv("API_PAGE_LIMIT_MAX") or 500)
+    # page number pagination total count mode: exact, estimated or none
+    API_PAGE_COUNT = os.getenv("API_PAGE_COUNT") or "exact"
+    # rows fetched and sent per chunk by streamed list responses
+    API_STREAM_CHUNK_SIZE = int(os.getenv("API_STREAM_CHUNK_SIZE") or 1000)
+
     # JWT
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
     JWT_HEADER_TYPE = "AccessToken"
     JWT_ACCESS_TOKEN_EXPIRES = datetime.timedelta(
-        hours=int(os.getenv("JWT_ACCESS_TOKEN_EXPIRES_IN_HOURS", 24)),
+        hours=int(os.getenv("JWT_ACCESS_TOKEN_EXPIRES_IN_HOURS") or 24),
     )
 
+    # spec built by `flask spec build`, served from memory if precomputed
+    SPEC_PRECOMPUTED = False
+    SPEC_DIR = os.getenv("SPEC_DIR") or os.path.join(PROJECT_DIR, "spec")
+    SPEC_MAX_AGE = int(os.getenv("SPEC_MAX_AGE") or 86400)
+
     # Swagger
     SWAGGER_TEMPLATE = {
         "securityDefinitions": {
@@ -83,6 +155,26 @@ class ProdConfig(Config):
     ENV = "production"
     TESTING = False
     DEBUG = False
+    QUERY_STATS_HEADERS = False
+    SPEC_PRECOMPUTED = True
+
+    # psycopg2 cooperative mode under gevent worker
+    DATABASE_GREEN = True
+    # expected concurrent requests using database in one worker
+    DATABASE_CONCURRENCY = int(os.getenv("DATABASE_CONCURRENCY") or 20)
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": DATABASE_CONCURRENCY,
+        "max_overflow": DATABASE_CONCURRENCY // 2,
+        "pool_timeout": int(os.getenv("DATABASE_POOL_TIMEOUT") or 10),
+        "pool_recycle": int(os.getenv("DATABASE_POOL_RECYCLE") or 1800),
+        "pool_pre_ping": True,
+        "connect_args": {
+            "connect_timeout": int(os.getenv("DATABASE_CONNECT_TIMEOUT") or 5),
+            "options": "-c statement_timeout={}".format(
+                int(os.getenv("DATABASE_STATEMENT_TIMEOUT_MS") or 30000),
+            ),
+        },
+    }
 
 
 class TestConfig(Config):
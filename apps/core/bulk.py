@@ -0,0 +1,40 @@
+import csv
+import io
+
+from apps import db
+
+COPY_NULL = "\\N"
+
+
+def bulk_insert(table, rows):
+    """
+    Insert rows in current transaction by one round trip:
+    COPY on PostgreSQL, executemany insert on other databases.
+    :param table: sqlalchemy table
+    :param list rows: dicts with same keys
+    """
+
+    if not rows:
+        return
+
+    if db.engine.dialect.name != "postgresql":
+        db.session.execute(table.insert(), rows)
+        return
+
+    columns = list(rows[0].keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    for row in rows:
+        writer.writerow([
+            COPY_NULL if row[column] is None else row[column]
+            for column in columns
+        ])
+    buffer.seek(0)
+
+    cursor = db.session.connection().connection.cursor()
+    cursor.copy_expert(
+        f"COPY {table.name} ({', '.join(columns)}) "
+        f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+        buffer,
+    )
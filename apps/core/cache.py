@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """
+    Bounded in-memory store with least-recently-used eviction
+    and per-entry time to live.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60, maxbytes=None):
+        """
+        :param int maxsize: max number of stored entries
+        :param int ttl: entry time to live in seconds
+        :param int maxbytes: max total size of stored entries
+        """
+
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        # incremented by clear, so values built before it aren't stored
+        self.generation = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Get value by key and mark it as recently used.
+        :param key: entry key
+        :param default: value returned on miss
+        """
+
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._pop(key)
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, size=1, generation=None):
+        """
+        Store value, evicting the least recently used entries.
+        :param key: entry key
+        :param value: entry value
+        :param int size: entry size, counted against maxbytes
+        :param int generation: cache generation read before value was
+            built, value isn't stored if cache was cleared since
+        """
+
+        with self._lock:
+            if self.maxbytes and size > self.maxbytes:
+                return
+
+            if generation is not None and generation != self.generation:
+                return
+
+            self._pop(key)
+            self._data[key] = (time.monotonic() + self.ttl, value, size)
+            self.bytes += size
+
+            while len(self._data) > self.maxsize \
+                    or (self.maxbytes and self.bytes > self.maxbytes):
+                self._pop(next(iter(self._data)))
+                self.evictions += 1
+
+    def delete(self, key):
+        """ Remove entry by key if it exists. """
+
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        """ Remove all entries. """
+
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+            self.generation += 1
+
+    def _pop(self, key):
+        entry = self._data.pop(key, None)
+
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    @property
+    def stats(self):
+        """
+        Cache counters.
+        :rtype: dict
+        """
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+        }
+
+    def __len__(self):
+        return len(self._data)
+
+
+# list endpoints response caches by model class
+response_caches = {}
+
+
+def get_response_cache(model, config):
+    """
+    Get response cache of model list endpoints,
+    create it from app config on first call.
+    :param model: model class
+    :param config: app config
+    :rtype: LRUCache
+    """
+
+    cache = response_caches.get(model)
+
+    if cache is None:
+        cache = LRUCache(
+            maxsize=config.get("RESPONSE_CACHE_SIZE"),
+            ttl=config.get("RESPONSE_CACHE_TTL"),
+            maxbytes=config.get("RESPONSE_CACHE_MAX_BYTES"),
+        )
+        response_caches[model] = cache
+
+    return cache
+
+
+def clear_response_cache(model):
+    """
+    Drop cached list responses of model.
+    :param model: model class
+    """
+
+    cache = response_caches.get(model)
+
+    if cache is not None:
+        cache.clear()
@@ -0,0 +1,254 @@
+import zlib
+
+from flask import request, current_app
+
+from apps.core.cache import LRUCache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+COMPRESS_MIMETYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/msgpack",
+    "application/javascript",
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/javascript",
+    "image/svg+xml",
+)
+# endpoints which payloads don't change, compressed once and cached
+PRECOMPRESSED_BLUEPRINTS = ("flasgger",)
+PRECOMPRESSED_ENDPOINTS = ("static", "apispec")
+
+
+class GzipCompressor(object):
+    """ Gzip stream compressor. """
+
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(
+            level, zlib.DEFLATED, 16 + zlib.MAX_WBITS,
+        )
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliCompressor(object):
+    """ Brotli stream compressor. """
+
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class ZstdCompressor(object):
+    """ Zstandard stream compressor. """
+
+    def __init__(self, level):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+def get_compressors():
+    """
+    Available compressors in preference order.
+    :return: content coding to (compressor class, level config key) map
+    :rtype: dict
+    """
+
+    compressors = {}
+
+    if brotli is not None:
+        compressors["br"] = (BrotliCompressor, "COMPRESS_BROTLI_LEVEL")
+
+    if zstandard is not None:
+        compressors["zstd"] = (ZstdCompressor, "COMPRESS_ZSTD_LEVEL")
+
+    compressors["gzip"] = (GzipCompressor, "COMPRESS_LEVEL")
+    return compressors
+
+
+class Compress(object):
+    """
+    Compress responses by Accept-Encoding with brotli, zstd or gzip.
+    Responses smaller than COMPRESS_MIN_SIZE are sent as is,
+    streamed responses are compressed chunk by chunk.
+    """
+
+    def __init__(self, app=None):
+        self.compressors = get_compressors()
+        self.cache = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Register compression after request hook.
+        :param app: Flask app
+        """
+
+        if not app.config.get("COMPRESS_ENABLED", True):
+            return
+
+        self.cache = LRUCache(
+            maxsize=app.config.get("COMPRESS_CACHE_SIZE", 64),
+            ttl=app.config.get("COMPRESS_CACHE_TTL", 3600),
+            maxbytes=app.config.get("COMPRESS_CACHE_MAX_BYTES"),
+        )
+        app.extensions["compress"] = self
+        app.after_request(self.after_request)
+
+    def choose_encoding(self, accept_encoding):
+        """
+        Choose most preferred available content coding accepted by client.
+        :param accept_encoding: request accept encodings
+        :return: content coding or None
+        """
+
+        if not accept_encoding:
+            return None
+
+        encodings = sorted(
+            self.compressors,
+            key=lambda encoding: accept_encoding.quality(encoding),
+            reverse=True,
+        )
+
+        if accept_encoding.quality(encodings[0]) > 0:
+            return encodings[0]
+
+        return None
+
+    def get_compressor(self, encoding, config):
+        compressor_class, level_key = self.compressors[encoding]
+        return compressor_class(config.get(level_key))
+
+    def is_precompressed(self):
+        return request.blueprint in PRECOMPRESSED_BLUEPRINTS \
+            or request.endpoint in PRECOMPRESSED_ENDPOINTS
+
+    def after_request(self, response):
+        """
+        Compress response if it is compressible and client accepts it.
+        :param response: Flask response
+        :rtype: Response
+        """
+
+        if response.mimetype not in COMPRESS_MIMETYPES:
+            return response
+
+        response.vary.add("Accept-Encoding")
+
+        if request.method == "HEAD" \
+                or response.status_code < 200 \
+                or response.status_code in (204, 206, 304) \
+                or "Content-Encoding" in response.headers:
+            return response
+
+        encoding = self.choose_encoding(request.accept_encodings)
+
+        if encoding is None:
+            return response
+
+        config = current_app.config
+
+        if self.is_precompressed():
+            response.direct_passthrough = False
+            response.set_data(self.compress_cached(
+                encoding, response.get_data(), config,
+            ))
+        elif response.is_streamed:
+            response.response = self.compress_stream(
+                encoding, response.iter_encoded(), config,
+            )
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+
+            if len(data) < config.get("COMPRESS_MIN_SIZE"):
+                return response
+
+            compressor = self.get_compressor(encoding, config)
+            response.set_data(
+                compressor.compress(data) + compressor.finish(),
+            )
+
+        response.headers["Content-Encoding"] = encoding
+
+        # compressed payload isn't byte to byte equal to origin one
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+        return response
+
+    def compress_cached(self, encoding, data, config):
+        """
+        Get compressed payload from cache or compress and cache it.
+        :param str encoding: content coding
+        :param bytes data: payload
+        :param config: app config
+        :rtype: bytes
+        """
+
+        key = (request.path, encoding, len(data), hash(data))
+        compressed = self.cache.get(key)
+
+        if compressed is None:
+            compressor = self.get_compressor(encoding, config)
+            compressed = compressor.compress(data) + compressor.finish()
+            self.cache.set(key, compressed, size=len(compressed))
+
+        return compressed
+
+    def compress_stream(self, encoding, chunks, config):
+        """
+        Compress response chunks, every chunk is flushed
+        so client gets it without waiting for the whole body.
+        :param str encoding: content coding
+        :param chunks: response bytes chunks
+        :param config: app config
+        :return: compressed chunks generator
+        """
+
+        compressor = self.get_compressor(encoding, config)
+
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush()
+
+            if data:
+                yield data
+
+        yield compressor.finish()
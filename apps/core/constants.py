@@ -1,5 +1,7 @@
 AUTHORIZATION_HEADER = "Authorization"
 APPLICATION_JSON = "application/json"
+APPLICATION_NDJSON = "application/x-ndjson"
+APPLICATION_MSGPACK = "application/msgpack"
 APPLICATION_X = "application/x-www-form-urlencoded"
 
 # Validation
@@ -8,6 +10,9 @@ IN_USE = "already in use."
 NOT_FOUND = "does not exist."
 MISSING_DATA_FOR_REQUIRED = "Missing data for required field."
 INVALID_NUMBER = "Not a valid number."
+INVALID_VALUE = "Invalid value."
+INVALID_FIELD = "Invalid field: {field}."
+NOT_ALLOWED_SORT_FIELD = "Sorting by this field is not allowed."
 SOMETHING_WENT_WRONG = "Something went wrong. Please check your input data, " \
                        "maybe it's incorrect."
 
@@ -17,7 +22,9 @@ ENUM_WRONG_VALUE = "Does not fit to any variant."
 # API
 METHOD_NOT_ALLOWED = "The method is not allowed for the requested URL."
 WRONG_REQUEST_DATA_TYPE = "Wrong request data type."
+MALFORMED_REQUEST_DATA = "Malformed request data."
 ACCESS_DENIED = "Access denied."
 EMPTY_PAYLOAD = "Empty payload."
 MISSING_AUTH_HEADER = "Missing authorization header."
 INVALID_TOKEN = "Invalid token."
+INVALID_CURSOR = "Invalid cursor."
@@ -0,0 +1,45 @@
+from flask import current_app, has_app_context
+
+try:
+    from gevent import monkey
+    from gevent.threadpool import ThreadPool
+except ImportError:
+    monkey = ThreadPool = None
+
+_hash_pool = None
+
+
+def get_hash_pool(size):
+    """
+    Get native threads pool for password hashing, created on
+    first call in current process (after gunicorn worker fork).
+    :param int size: max pool threads count
+    :rtype: ThreadPool
+    """
+
+    global _hash_pool
+
+    if _hash_pool is None:
+        _hash_pool = ThreadPool(size)
+
+    return _hash_pool
+
+
+def run_hashing(func, *args):
+    """
+    Run CPU bound hashing function. Under gevent it's executed in
+    native thread pool, so hub keeps switching other greenlets while
+    hashlib works without GIL. Otherwise function is called directly.
+    :param func: hashing function
+    :param args: function args
+    :return: function result
+    """
+
+    size = current_app.config.get("HASH_POOL_SIZE") \
+        if has_app_context() else None
+
+    if not size or ThreadPool is None \
+            or not monkey.is_module_patched("threading"):
+        return func(*args)
+
+    return get_hash_pool(size).apply(func, args)
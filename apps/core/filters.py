@@ -0,0 +1,122 @@
+import datetime
+import operator
+
+from sqlalchemy import Boolean, DateTime, Integer
+
+from apps.core.constants import INVALID_VALUE, NOT_ALLOWED_SORT_FIELD
+
+OPERATORS = {
+    "eq": operator.eq,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+TRUE_VALUES = ("true", "1")
+FALSE_VALUES = ("false", "0")
+DATETIME_FORMATS = (
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d",
+)
+
+
+class InvalidFilter(ValueError):
+    """ Raised when filter or sort arg is invalid. """
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def parse_value(column, value):
+    """
+    Convert request arg value to column type.
+    :param column: model column
+    :param str value: raw value
+    :raises ValueError: if value doesn't fit column type
+    """
+
+    if isinstance(column.type, Boolean):
+        if value.lower() in TRUE_VALUES:
+            return True
+        if value.lower() in FALSE_VALUES:
+            return False
+        raise ValueError(value)
+
+    if isinstance(column.type, DateTime):
+        for date_format in DATETIME_FORMATS:
+            try:
+                return datetime.datetime.strptime(value, date_format)
+            except ValueError:
+                continue
+        raise ValueError(value)
+
+    if isinstance(column.type, Integer):
+        return int(value)
+
+    return value
+
+
+def apply_filters(query, model, filter_fields, args):
+    """
+    Filter query by whitelisted request args.
+    :param query: sqlalchemy query
+    :param model: model class
+    :param dict filter_fields: arg name to (model field, operator) map
+    :param args: request args
+    :raises InvalidFilter: with errors by arg name
+    :return: sqlalchemy query
+    """
+
+    errors = {}
+
+    for arg, (field, operator_name) in filter_fields.items():
+        value = args.get(arg)
+
+        if value is None:
+            continue
+
+        column = getattr(model, field)
+
+        try:
+            query = query.filter(
+                OPERATORS[operator_name](column, parse_value(column, value)),
+            )
+        except ValueError:
+            errors[arg] = [INVALID_VALUE]
+
+    if errors:
+        raise InvalidFilter(errors)
+
+    return query
+
+
+def get_ordering(model, sort_fields, default_fields, value=None):
+    """
+    Get ordering columns from sort arg like `-created_at`.
+    Sort field is followed by id, so ordering is unique.
+    :param model: model class
+    :param sort_fields: whitelisted sort fields
+    :param default_fields: ordering fields without sort arg
+    :param str value: sort arg value
+    :raises InvalidFilter: if sort field isn't allowed
+    :return: ordering columns and descending flag
+    :rtype: tuple
+    """
+
+    if not value:
+        return [getattr(model, field) for field in default_fields], False
+
+    descending = value.startswith("-")
+    field = value.lstrip("-")
+
+    if field not in sort_fields:
+        raise InvalidFilter({"sort": [NOT_ALLOWED_SORT_FIELD]})
+
+    columns = [getattr(model, field)]
+
+    if field != "id":
+        columns.append(model.id)
+
+    return columns, descending
@@ -0,0 +1,59 @@
+import threading
+
+try:
+    from gevent import monkey
+    from gevent.socket import wait_read, wait_write
+    from greenlet import getcurrent
+except ImportError:
+    monkey = wait_read = wait_write = None
+    getcurrent = threading.get_ident
+
+try:
+    import psycopg2
+    from psycopg2 import extensions
+except ImportError:
+    psycopg2 = extensions = None
+
+
+def gevent_wait_callback(conn, timeout=None):
+    """
+    psycopg2 wait callback which waits for socket in gevent hub,
+    so query doesn't block other greenlets.
+    :param conn: psycopg2 connection
+    """
+
+    while True:
+        state = conn.poll()
+
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise psycopg2.OperationalError(f"Bad result from poll: {state}")
+
+
+def make_psycopg2_green():
+    """ Install gevent wait callback to psycopg2. """
+
+    extensions.set_wait_callback(gevent_wait_callback)
+
+
+def is_gevent_patched():
+    """
+    Check if sockets are patched by gevent, e.g. by gevent gunicorn worker.
+    :rtype: bool
+    """
+
+    return monkey is not None and monkey.is_module_patched("socket")
+
+
+def get_session_scope():
+    """
+    Scoped session key: current greenlet, which is
+    also unique per thread when gevent isn't used.
+    """
+
+    return getcurrent()
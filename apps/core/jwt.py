@@ -6,6 +6,9 @@ from apps.users.models import User
 def user_loader_callback(identity):
     """
     JWT callback for user loading.
+    User is loaded from database, not from model cache: cache of
+    other worker processes isn't invalidated by changes, so deleted
+    or demoted user would stay authenticated until cache TTL.
     :param str identity:
     :return: user object
     """
@@ -13,4 +16,4 @@ def user_loader_callback(identity):
     if not identity:
         return None
 
-    return User.query.filter_by(id=identity).first()
+    return User.query.get(identity)
@@ -0,0 +1,123 @@
+import os
+import time
+
+from flask import request, g, Response
+from prometheus_client import (
+    Counter, Gauge, Histogram, CollectorRegistry, REGISTRY,
+    CONTENT_TYPE_LATEST, generate_latest,
+)
+from prometheus_client import multiprocess
+
+# multiprocess mode is enabled by this env variable,
+# it must point to an empty dir shared by gunicorn workers
+MULTIPROCESS_DIR_ENV = "prometheus_multiproc_dir"
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75,
+    1.0, 2.5, 5.0, 10.0, float("inf"),
+)
+LABELS = ("endpoint", "method", "status")
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by endpoint, method and status.",
+    LABELS,
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests in progress by endpoint and method.",
+    ("endpoint", "method"),
+    multiprocess_mode="livesum",
+)
+REQUEST_BYTES = Counter(
+    "http_request_size_bytes",
+    "Request body bytes by endpoint, method and status.",
+    LABELS,
+)
+RESPONSE_BYTES = Counter(
+    "http_response_size_bytes",
+    "Response body bytes by endpoint, method and status.",
+    LABELS,
+)
+
+
+def get_endpoint():
+    """
+    Endpoint label, url rule keeps labels cardinality bounded.
+    :rtype: str
+    """
+
+    return request.url_rule.rule if request.url_rule else "none"
+
+
+def metrics_view():
+    """ Metrics in Prometheus text format. """
+
+    registry = REGISTRY
+
+    if MULTIPROCESS_DIR_ENV in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+class Metrics(object):
+    """
+    Collect requests latency histograms, in progress gauges
+    and request/response bytes counters, expose them at METRICS_URL.
+    Under gunicorn metrics are aggregated across workers
+    by prometheus_client multiprocess mode.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Register requests hooks and metrics endpoint.
+        Must be called before extensions changing response body,
+        so sent body size is counted.
+        :param app: Flask app
+        """
+
+        if not app.config.get("METRICS_ENABLED", True):
+            return
+
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+        app.teardown_request(self.teardown_request)
+        app.add_url_rule(
+            app.config.get("METRICS_URL", "/metrics"),
+            "metrics",
+            metrics_view,
+        )
+
+    @staticmethod
+    def before_request():
+        g.metrics_started = time.perf_counter()
+        g.metrics_endpoint = get_endpoint()
+        REQUESTS_IN_PROGRESS.labels(g.metrics_endpoint, request.method).inc()
+
+    @staticmethod
+    def after_request(response):
+        started = g.get("metrics_started")
+
+        if started is None:
+            return response
+
+        labels = (g.metrics_endpoint, request.method, response.status_code)
+        REQUEST_LATENCY.labels(*labels).observe(
+            time.perf_counter() - started,
+        )
+        REQUEST_BYTES.labels(*labels).inc(request.content_length or 0)
+        RESPONSE_BYTES.labels(*labels).inc(response.content_length or 0)
+        return response
+
+    @staticmethod
+    def teardown_request(error=None):
+        if g.get("metrics_started") is not None:
+            REQUESTS_IN_PROGRESS.labels(
+                g.metrics_endpoint, request.method,
+            ).dec()
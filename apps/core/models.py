@@ -1,8 +1,15 @@
 import datetime
 
-from sqlalchemy import Column, Integer, DateTime
+from flask import current_app
+from sqlalchemy import Column, Integer, DateTime, event
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.session import make_transient_to_detached
 
 from apps import db
+from apps.core.cache import (
+    LRUCache, clear_response_cache, response_caches,
+)
 
 
 class BaseModel(db.Model):
@@ -11,6 +18,11 @@ class BaseModel(db.Model):
     __abstract__ = True
     id = Column(Integer, primary_key=True, autoincrement=True)
 
+    # read-through cache backend class, must provide
+    # get/set/delete/clear methods and stats property
+    cache_backend = LRUCache
+    _caches = {}
+
     @classmethod
     def get_plural_name(cls):
         """
@@ -20,11 +32,107 @@ class BaseModel(db.Model):
 
         return cls.__tablename__.capitalize()
 
+    @classmethod
+    def get_cache(cls):
+        """
+        Get model cache, create it from app config on first call.
+        :return: cache backend instance
+        """
+
+        cache = BaseModel._caches.get(cls)
+
+        if cache is None:
+            cache = cls.cache_backend(
+                maxsize=current_app.config.get("MODEL_CACHE_SIZE", 1024),
+                ttl=current_app.config.get("MODEL_CACHE_TTL", 60),
+            )
+            BaseModel._caches[cls] = cache
+
+        return cache
+
+    @classmethod
+    def get_cache_stats(cls):
+        """
+        Model cache hit/miss counters.
+        :rtype: dict
+        """
+
+        return cls.get_cache().stats
+
+    @classmethod
+    def clear_caches(cls):
+        """ Remove all entries from all models and responses caches. """
+
+        for cache in BaseModel._caches.values():
+            cache.clear()
+
+        for model in list(response_caches):
+            clear_response_cache(model)
+
+    @classmethod
+    def get_cached(cls, resource_id):
+        """
+        Get instance by id from cache or load it from database.
+        Cached instance is attached to current session without query.
+        It isn't invalidated by writes of other processes, so it must
+        be used for reads only.
+        Stats are logged every MODEL_CACHE_LOG_INTERVAL lookups,
+        zero interval disables it.
+        :param resource_id: instance id
+        :return: model instance or None
+        """
+
+        config = current_app.config
+
+        if not config.get("MODEL_CACHE_SIZE"):
+            return cls.query.get(resource_id)
+
+        cache = cls.get_cache()
+        resource_id = int(resource_id)
+        values = cache.get(resource_id)
+        interval = config.get("MODEL_CACHE_LOG_INTERVAL")
+
+        if interval and not (cache.hits + cache.misses) % interval:
+            current_app.logger.info(
+                "Model cache of %s: %s", cls.__name__, cache.stats,
+            )
+
+        if values is None:
+            instance = cls.query.get(resource_id)
+
+            if instance is not None:
+                cache.set(resource_id, {
+                    attr.key: getattr(instance, attr.key)
+                    for attr in cls.__mapper__.column_attrs
+                })
+
+            return instance
+
+        instance = cls.__mapper__.class_manager.new_instance()
+        for key, value in values.items():
+            set_committed_value(instance, key, value)
+        make_transient_to_detached(instance)
+
+        return db.session.merge(instance, load=False)
+
+    @classmethod
+    def invalidate_cached(cls, resource_id):
+        """
+        Remove instance from model cache.
+        :param resource_id: instance id
+        """
+
+        cache = BaseModel._caches.get(cls)
+
+        if cache is not None and resource_id is not None:
+            cache.delete(int(resource_id))
+
     def save(self):
         """ Save current instance. """
 
         db.session.add(self)
         db.session.commit()
+        self.invalidate_cached(self.id)
 
     def update(self, data):
         """ Update current instance by data. """
@@ -32,12 +140,44 @@ class BaseModel(db.Model):
         for key, item in data.items():
             setattr(self, key, item)
         db.session.commit()
+        self.invalidate_cached(self.id)
 
     def delete(self):
         """ Delete current instance. """
 
+        resource_id = self.id
         db.session.delete(self)
         db.session.commit()
+        self.invalidate_cached(resource_id)
+
+    @classmethod
+    def bulk_update(cls, data, *criteria):
+        """
+        Update instances matching criteria with one UPDATE statement.
+        :param dict data: changed fields values
+        :param criteria: sqlalchemy filter expressions
+        :return: updated rows count
+        :rtype: int
+        """
+
+        count = cls.query.filter(*criteria)\
+            .update(data, synchronize_session=False)
+        db.session.commit()
+        return count
+
+    @classmethod
+    def bulk_delete(cls, *criteria):
+        """
+        Delete instances matching criteria with one DELETE statement.
+        :param criteria: sqlalchemy filter expressions
+        :return: deleted rows count
+        :rtype: int
+        """
+
+        count = cls.query.filter(*criteria)\
+            .delete(synchronize_session=False)
+        db.session.commit()
+        return count
 
     def __repr__(self, identity):
         return f"<{self.__class__.__name__} {identity} id:{self.id}>"
@@ -56,3 +196,56 @@ class DateTimeModel(BaseModel):
 
         data["updated_at"] = datetime.datetime.utcnow()
         super().update(data)
+
+    @classmethod
+    def bulk_update(cls, data, *criteria):
+        """ Set updated_at before doing bulk update. """
+
+        data["updated_at"] = datetime.datetime.utcnow()
+        return super().bulk_update(data, *criteria)
+
+
+def mark_changed(session, model):
+    """
+    Remember model changed in session transaction,
+    its response caches are dropped after commit.
+    :param session: sqlalchemy session
+    :param model: model class
+    """
+
+    session.info.setdefault("changed_models", set()).add(model)
+
+
+@event.listens_for(BaseModel, "after_insert", propagate=True)
+@event.listens_for(BaseModel, "after_update", propagate=True)
+@event.listens_for(BaseModel, "after_delete", propagate=True)
+def mark_instance_changed(mapper, connection, target):
+    mark_changed(object_session(target), mapper.class_)
+
+
+@event.listens_for(Session, "after_bulk_update")
+@event.listens_for(Session, "after_bulk_delete")
+def clear_bulk_changed_cache(context):
+    """
+    Bulk query update/delete can't tell which rows changed,
+    so drop the whole cache of affected model.
+    :param context: bulk operation context
+    """
+
+    cache = BaseModel._caches.get(context.mapper.class_)
+
+    if cache is not None:
+        cache.clear()
+
+    mark_changed(context.session, context.mapper.class_)
+
+
+@event.listens_for(Session, "after_commit")
+def clear_changed_response_caches(session):
+    for model in session.info.pop("changed_models", ()):
+        clear_response_cache(model)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_changed_models(session):
+    session.info.pop("changed_models", None)
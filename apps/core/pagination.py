@@ -0,0 +1,209 @@
+import base64
+import datetime
+import json
+
+from sqlalchemy import tuple_, func
+
+CURSOR_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+# total count modes
+COUNT_EXACT = "exact"
+COUNT_ESTIMATED = "estimated"
+COUNT_NONE = "none"
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATED, COUNT_NONE)
+
+
+class InvalidCursor(ValueError):
+    """ Raised when pagination cursor can't be decoded. """
+
+
+def get_limit(value, default, maximum):
+    """
+    Parse page size from request arg and clamp it to allowed range.
+    :param str value: raw limit value
+    :param int default: default page size
+    :param int maximum: max page size
+    :rtype: int
+    """
+
+    if not value or not str(value).isdigit():
+        return default
+
+    return max(1, min(int(value), maximum))
+
+
+def order_by(columns, descending=False):
+    """
+    Ordering clauses for columns in one direction.
+    :param columns: ordering columns
+    :param bool descending: order by columns descending
+    :rtype: list
+    """
+
+    return [column.desc() for column in columns] if descending else columns
+
+
+def encode_cursor(values):
+    """
+    Build opaque cursor from ordering column values of the last row.
+    :param values: ordering columns values
+    :rtype: str
+    """
+
+    raw = json.dumps([
+        value.strftime(CURSOR_DATETIME_FORMAT)
+        if isinstance(value, datetime.datetime) else value
+        for value in values
+    ])
+
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_value(value, column):
+    """
+    Convert cursor value to python type of ordering column.
+    :param value: value loaded from cursor JSON
+    :param column: ordering column
+    :raise InvalidCursor: if value type doesn't match column type
+    """
+
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+
+    if python_type is datetime.datetime and isinstance(value, str):
+        return datetime.datetime.strptime(value, CURSOR_DATETIME_FORMAT)
+
+    if python_type is float and type(value) is int:
+        return float(value)
+
+    # bool is int subclass, but isn't valid value of integer column
+    if type(value) is bool and python_type is not bool \
+            or not isinstance(value, python_type):
+        raise InvalidCursor(value)
+
+    return value
+
+
+def decode_cursor(cursor, columns):
+    """
+    Decode cursor into ordering column values.
+    Every value must have python type of its column.
+    :param str cursor: opaque cursor
+    :param columns: ordering columns
+    :rtype: list
+    """
+
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise InvalidCursor(cursor)
+
+        return [
+            decode_value(value, column)
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+
+
+def keyset_filter(query, columns, cursor=None, descending=False):
+    """
+    Filter query rows placed after cursor and order them by columns.
+    :param query: sqlalchemy query
+    :param columns: ordering columns, last one must be unique
+    :param str cursor: cursor of the last seen row
+    :param bool descending: order by columns descending
+    :return: sqlalchemy query
+    """
+
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        row, last = tuple_(*columns), tuple_(*values)
+        query = query.filter(row < last if descending else row > last)
+
+    return query.order_by(*order_by(columns, descending))
+
+
+def keyset_paginate(query, columns, limit, cursor=None, descending=False):
+    """
+    Get page of rows placed after cursor by ordering columns.
+    Uses row values comparison, so cost doesn't depend on page depth.
+    :param query: sqlalchemy query
+    :param columns: ordering columns, last one must be unique
+    :param int limit: page size
+    :param str cursor: cursor of the previous page last row
+    :param bool descending: order by columns descending
+    :return: page items and next page cursor (None for last page)
+    :rtype: tuple
+    """
+
+    query = keyset_filter(query, columns, cursor, descending)
+    items = query.limit(limit + 1).all()
+    next_cursor = None
+
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(
+            [getattr(items[-1], column.key) for column in columns],
+        )
+
+    return items, next_cursor
+
+
+def estimate_count(query):
+    """
+    Get rows count estimated by PostgreSQL planner statistics.
+    :param query: sqlalchemy query
+    :rtype: int
+    """
+
+    connection = query.session.connection()
+    compiled = query.order_by(None).statement.compile(
+        dialect=connection.dialect,
+    )
+    plan = connection.execute(
+        f"EXPLAIN (FORMAT JSON) {compiled}",
+        compiled.params,
+    ).scalar()
+
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def offset_paginate(query, page, limit, count=COUNT_EXACT):
+    """
+    Get page of rows by page number with total rows count.
+    Exact total is selected with rows by count(*) OVER () window,
+    so page and total take one round trip. Estimated total is read
+    from planner statistics on PostgreSQL and counted exactly on
+    other databases.
+    :param query: sqlalchemy query
+    :param int page: page number
+    :param int limit: page size
+    :param str count: total count mode
+    :return: page items, total count (None if not counted)
+        and flag if total is estimated
+    :rtype: tuple
+    """
+
+    offset = (page - 1) * limit
+    dialect = query.session.get_bind().dialect.name
+
+    if count == COUNT_NONE:
+        return query.limit(limit).offset(offset).all(), None, False
+
+    if count == COUNT_ESTIMATED and dialect == "postgresql":
+        items = query.limit(limit).offset(offset).all()
+        return items, estimate_count(query), True
+
+    rows = query.add_columns(func.count().over())\
+        .limit(limit).offset(offset).all()
+
+    if rows:
+        return [row[0] for row in rows], rows[0][1], False
+
+    # window isn't computed for page after the last one
+    return [], query.order_by(None).count() if offset else 0, False
@@ -0,0 +1,134 @@
+import logging
+import time
+from collections import Counter
+
+from flask import (
+    has_request_context, current_app, request, _request_ctx_stack,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SLOW_QUERY_LOGGER = "apps.slow_queries"
+
+slow_query_logger = logging.getLogger(SLOW_QUERY_LOGGER)
+
+
+class QueryStats(object):
+    """ Statements count, time and shapes of one request. """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def add(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement] += 1
+
+    def get_repeated(self, threshold):
+        """
+        Statements executed at least threshold times, likely N+1.
+        :param int threshold: min executions count
+        :rtype: dict
+        """
+
+        return {
+            statement: count
+            for statement, count in self.shapes.items()
+            if count >= threshold
+        }
+
+
+def get_query_stats():
+    """
+    Current request query stats, None outside of request.
+    :rtype: QueryStats
+    """
+
+    if not has_request_context():
+        return None
+
+    # kept in request context, app context and g may be
+    # shared by several requests
+    ctx = _request_ctx_stack.top
+
+    if not hasattr(ctx, "query_stats"):
+        ctx.query_stats = QueryStats()
+
+    return ctx.query_stats
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def start_query_timer(conn, cursor, statement, parameters, context,
+                      executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def track_query(conn, cursor, statement, parameters, context, executemany):
+    """ Add statement to request stats and log it if it is slow. """
+
+    started = conn.info["query_started"].pop()
+    stats = get_query_stats()
+
+    if stats is None or not current_app.config.get("QUERY_STATS_ENABLED"):
+        return
+
+    duration = time.perf_counter() - started
+    stats.add(statement, duration)
+
+    threshold = current_app.config.get("SLOW_QUERY_THRESHOLD_MS")
+    if threshold and duration * 1000 >= threshold:
+        slow_query_logger.warning(
+            "%.1f ms %s %s: %s",
+            duration * 1000,
+            request.method,
+            request.path,
+            statement,
+        )
+
+
+class QueryTracker(object):
+    """
+    Count statements and DB time per request, log slow statements
+    and repeated statement shapes (likely N+1). Totals are attached
+    as X-DB-* response headers if QUERY_STATS_HEADERS is set.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Register query stats after request hook.
+        :param app: Flask app
+        """
+
+        if not app.config.get("QUERY_STATS_ENABLED"):
+            return
+
+        app.after_request(self.after_request)
+
+    @staticmethod
+    def after_request(response):
+        stats = get_query_stats()
+        config = current_app.config
+        repeated = stats.get_repeated(config.get("N_PLUS_ONE_THRESHOLD"))
+
+        for statement, count in repeated.items():
+            current_app.logger.warning(
+                "Possible N+1: statement executed %s times by %s %s: %s",
+                count,
+                request.method,
+                request.path,
+                statement,
+            )
+
+        if config.get("QUERY_STATS_HEADERS"):
+            response.headers["X-DB-Statements"] = stats.count
+            response.headers["X-DB-Time"] = f"{stats.duration * 1000:.2f}"
+            response.headers["X-DB-Repeated-Statements"] = len(repeated)
+
+        return response
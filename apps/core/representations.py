@@ -0,0 +1,28 @@
+import msgpack
+from flask import make_response
+
+
+def output_msgpack(data, code, headers=None):
+    """
+    Make Flask response with MessagePack encoded body.
+    :param data: response data
+    :param int code: response status code
+    :param dict headers: response headers
+    """
+
+    resp = make_response(msgpack.packb(data, use_bin_type=True), code)
+    resp.headers.extend(headers or {})
+    return resp
+
+
+def load_msgpack(body):
+    """
+    Decode MessagePack request body.
+    :param bytes body: request body
+    :raises ValueError: if body is malformed
+    """
+
+    try:
+        return msgpack.unpackb(body, raw=False)
+    except Exception as error:
+        raise ValueError(error)
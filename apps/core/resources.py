@@ -1,11 +1,28 @@
+import hashlib
+from urllib.parse import urlencode
+
 from flasgger import SwaggerView
-from flask import request
+from flask import request, current_app, json, Response, stream_with_context
 from flask_jwt_extended import jwt_required
 from flask_restful import Resource
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
+from werkzeug.http import quote_etag, unquote_etag, http_date, parse_date
 
-from apps.core.constants import EMPTY_PAYLOAD, SOMETHING_WENT_WRONG
-from apps.core.schemes import BadRequestSchema, MessageSchema
+from apps import db
+from apps.core.cache import get_response_cache
+from apps.core.constants import (
+    EMPTY_PAYLOAD, SOMETHING_WENT_WRONG, INVALID_CURSOR, APPLICATION_JSON,
+    APPLICATION_NDJSON, INVALID_FIELD, APPLICATION_MSGPACK,
+    WRONG_REQUEST_DATA_TYPE, MALFORMED_REQUEST_DATA,
+)
+from apps.core.filters import apply_filters, get_ordering, InvalidFilter
+from apps.core.pagination import (
+    get_limit, keyset_paginate, keyset_filter, offset_paginate, order_by,
+    InvalidCursor, COUNT_MODES,
+)
+from apps.core.representations import load_msgpack
+from apps.core.schemes import BadRequestSchema, MessageSchema, get_schema
 
 
 class BaseResource(Resource, SwaggerView):
@@ -13,6 +30,16 @@ class BaseResource(Resource, SwaggerView):
 
     data = None
     serializer = None
+    # sparse fieldset requested by `fields` arg
+    only_fields = None
+    # default ordering used by keyset pagination, last field must be unique
+    cursor_fields = ("created_at", "id")
+    # whitelisted list filters, arg name to (model field, operator) map
+    filter_fields = {}
+    # whitelisted list sort fields, used as `sort=field` or `sort=-field`
+    sort_fields = ()
+    # cache list responses, only for lists which don't depend on user
+    response_cache = False
     security = [
         {"AccessToken": []},
     ]
@@ -44,20 +71,33 @@ class BaseResource(Resource, SwaggerView):
 
     def dispatch_request(self, *args, **kwargs):
         """
-        Check if request payload exists and if it is json.
+        Check if request payload exists and if it is json or msgpack.
         If request data exists add it's as class property.
+        Payload is optional for DELETE requests.
         :param args:
         :param kwargs:
         """
         try:
-            if request.method in ["POST", "PUT", "PATCH"]:
-                if not request.is_json:
-                    message = "Wrong request data type."
-                    return self.make_response(status_code=400, message=message)
-
-                self.data = request.get_json()
+            if request.method in ["POST", "PUT", "PATCH", "DELETE"]:
+                if request.is_json:
+                    self.data = request.get_json(
+                        silent=request.method == "DELETE",
+                    )
+                elif request.mimetype == APPLICATION_MSGPACK:
+                    try:
+                        self.data = load_msgpack(request.get_data())
+                    except ValueError:
+                        return self.make_response(
+                            status_code=400,
+                            message=MALFORMED_REQUEST_DATA,
+                        )
+                elif request.method != "DELETE":
+                    return self.make_response(
+                        status_code=400,
+                        message=WRONG_REQUEST_DATA_TYPE,
+                    )
 
-                if not self.data:
+                if not self.data and request.method != "DELETE":
                     return self.make_response(
                         status_code=400,
                         message=EMPTY_PAYLOAD,
@@ -70,27 +110,155 @@ class BaseResource(Resource, SwaggerView):
                 message=SOMETHING_WENT_WRONG,
             )
 
+    def parse_fields(self):
+        """
+        Set sparse fieldset requested by `fields` arg. It's called by
+        handlers after authentication, so schema fields names aren't
+        exposed to anonymous clients.
+        :return: errors of invalid fields or None
+        """
+
+        if not self.serializer or not request.args.get("fields"):
+            return None
+
+        self.only_fields = tuple(sorted({
+            field.strip()
+            for field in request.args["fields"].split(",")
+            if field.strip()
+        })) or None
+        schema = get_schema(self.serializer)
+        invalid = [
+            field for field in self.only_fields or ()
+            if field not in schema.fields or schema.fields[field].load_only
+        ]
+
+        if not invalid:
+            return None
+
+        return {
+            "fields": [INVALID_FIELD.format(field=field) for field in invalid],
+        }
+
     def get_list(self, parsed_args, error, query=None):
         """
-        Get list of resource objects.
+        Get list of resource objects filtered and sorted by
+        whitelisted args.
+        Streamed without page size limit if client asks for it,
+        otherwise paginated and served from response cache if it's
+        enabled for resource.
         :param query: provided sqlalchemy query
         :param error: error message
         :param parsed_args: dict with parsed args (from request)
         """
-        page = parsed_args.get("page")
-        limit = parsed_args.get("limit")
 
         if not query:
             query = self.model.query
 
-        if (page and page.isdigit()) and (limit and limit.isdigit()):
-            resources = query.paginate(
-                page=int(page),
-                per_page=int(limit),
-                error_out=False,
-            ).items
+        try:
+            query = apply_filters(
+                query,
+                self.model,
+                self.filter_fields,
+                parsed_args,
+            )
+            ordering = get_ordering(
+                self.model,
+                self.sort_fields,
+                self.cursor_fields,
+                parsed_args.get("sort"),
+            )
+        except InvalidFilter as exc:
+            return self.make_response(status_code=400, message=exc.errors)
+
+        if self.only_fields:
+            query = query.options(load_only(*self.get_load_fields(ordering)))
+
+        if self.is_stream_requested(parsed_args):
+            try:
+                query = keyset_filter(
+                    query,
+                    columns=ordering[0],
+                    cursor=parsed_args.get("after"),
+                    descending=ordering[1],
+                )
+            except InvalidCursor:
+                return self.make_response(
+                    status_code=400,
+                    message=INVALID_CURSOR,
+                )
+
+            return self.make_stream_response(query)
+
+        if self.response_cache and current_app.config.get(
+                "RESPONSE_CACHE_SIZE"):
+            return self.get_cached_response(
+                lambda: self.paginate_list(
+                    parsed_args, error, query, ordering,
+                ),
+            )
+
+        return self.paginate_list(parsed_args, error, query, ordering)
+
+    def paginate_list(self, parsed_args, error, query, ordering):
+        """
+        Get page of resource objects.
+        Paginated by page number when `page` arg is passed, otherwise
+        by cursor from `after` arg. Page size is limited by config.
+        Page number pagination returns total count in X-Total-Count
+        header, counted by `count` arg mode: exact, estimated or none.
+        :param query: sqlalchemy query
+        :param error: error message
+        :param parsed_args: dict with parsed args (from request)
+        :param tuple ordering: ordering columns and descending flag
+        """
+        page = parsed_args.get("page")
+        columns, descending = ordering
+        limit = get_limit(
+            parsed_args.get("limit"),
+            default=current_app.config.get("API_PAGE_LIMIT_DEFAULT"),
+            maximum=current_app.config.get("API_PAGE_LIMIT_MAX"),
+        )
+        headers = {}
+
+        if page and page.isdigit():
+            count = parsed_args.get("count")
+
+            if count not in COUNT_MODES:
+                count = current_app.config.get("API_PAGE_COUNT")
+
+            resources, total, estimated = offset_paginate(
+                query.order_by(*order_by(columns, descending)),
+                page=max(1, int(page)),
+                limit=limit,
+                count=count,
+            )
+
+            if total is not None:
+                headers["X-Total-Count"] = total
+
+                if estimated:
+                    headers["X-Total-Count-Estimated"] = 1
         else:
-            resources = query.all()
+            try:
+                resources, next_cursor = keyset_paginate(
+                    query,
+                    columns=columns,
+                    limit=limit,
+                    cursor=parsed_args.get("after"),
+                    descending=descending,
+                )
+            except InvalidCursor:
+                return self.make_response(
+                    status_code=400,
+                    message=INVALID_CURSOR,
+                )
+
+            if next_cursor:
+                args = parsed_args.to_dict()
+                args.update({"after": next_cursor, "limit": limit})
+                headers["X-Next-Cursor"] = next_cursor
+                headers["Link"] = \
+                    f'<{request.base_url}?{urlencode(args)}>; rel="next"'
 
         if not resources:
             return self.make_response(
@@ -98,26 +266,277 @@ class BaseResource(Resource, SwaggerView):
                 status_code=200,
             )
 
-        return self.make_response(payload=resources)
+        return self.make_response(payload=resources, headers=headers)
+
+    def get_load_fields(self, ordering):
+        """
+        Model columns required for requested sparse fieldset,
+        ordering and response validators.
+        :param tuple ordering: ordering columns and descending flag
+        :rtype: set
+        """
+
+        columns = set(self.model.__mapper__.column_attrs.keys())
+        fields = {"id", "updated_at"} | set(self.only_fields)
+        fields.update(column.key for column in ordering[0])
+
+        return fields & columns
+
+    def get_cached_response(self, build):
+        """
+        Get response from cache keyed by endpoint and normalized query
+        args, or build and store it. Cache of resource model is dropped
+        after any committed change of its instances.
+        Stats are logged every RESPONSE_CACHE_LOG_INTERVAL lookups,
+        zero interval disables it.
+        :param build: function building response
+        """
+
+        config = current_app.config
+        cache = get_response_cache(self.model, config)
+        # cached headers have ETag of negotiated format
+        key = (
+            request.endpoint,
+            self.get_mimetype(),
+            tuple(sorted(request.args.items(multi=True))),
+        )
+        # read before querying, response built from rows changed by
+        # concurrent commit isn't stored after its invalidation
+        generation = cache.generation
+        response = cache.get(key)
+
+        if response is None:
+            response = build()
+
+            if not isinstance(response, Response) and response[1] == 200:
+                cache.set(
+                    key,
+                    response,
+                    size=self.estimate_size(response[0]),
+                    generation=generation,
+                )
+        elif len(response) > 2 and self.is_fresh(response[2]):
+            response = Response(status=304, headers=response[2])
+
+        interval = config.get("RESPONSE_CACHE_LOG_INTERVAL")
+
+        if interval and not (cache.hits + cache.misses) % interval:
+            current_app.logger.info(
+                "Response cache of %s: %s",
+                self.model.__name__,
+                cache.stats,
+            )
+
+        return response
+
+    @staticmethod
+    def estimate_size(payload):
+        """
+        Estimate JSON size of serialized payload, list size is estimated
+        by its first item, so page isn't encoded twice.
+        :param payload: serialized list or dict
+        :rtype: int
+        """
 
-    def make_response(self, payload=None, status_code=200, message=None):
+        if isinstance(payload, list) and payload:
+            return len(json.dumps(payload[0])) * len(payload)
+
+        return len(json.dumps(payload))
+
+    def get_bulk_ids(self, ids):
+        """
+        Get existing resource ids for bulk operation by one query.
+        :param list ids: requested ids
+        :rtype: set
+        """
+
+        query = db.session.query(self.model.id)\
+            .filter(self.model.id.in_(ids))
+
+        return {resource_id for resource_id, in query}
+
+    def get_bulk_criteria(self, filters):
+        """
+        Filter expressions of bulk operation by fields values,
+        applied by UPDATE/DELETE statement itself.
+        :param dict filters: whitelisted fields values
+        :rtype: list
+        """
+
+        return [
+            getattr(self.model, field) == value
+            for field, value in filters.items()
+        ]
+
+    def get_serializer(self, many=False):
+        """
+        Get cached instance of resource serializer
+        limited by requested sparse fieldset.
+        :param bool many: serialize collections
+        :return: schema instance
+        """
+
+        return get_schema(self.serializer, many=many, only=self.only_fields)
+
+    @staticmethod
+    def get_mimetype():
+        """
+        Response mimetype negotiated by Accept header,
+        in the same way as API representation is chosen.
+        :rtype: str
+        """
+
+        return request.accept_mimetypes.best_match(
+            [APPLICATION_JSON, APPLICATION_MSGPACK],
+            default=APPLICATION_JSON,
+        )
+
+    @staticmethod
+    def accepts_ndjson():
+        """
+        Check if client prefers NDJSON by Accept header.
+        :rtype: bool
+        """
+
+        best = request.accept_mimetypes.best_match(
+            [APPLICATION_JSON, APPLICATION_NDJSON],
+        )
+        return best == APPLICATION_NDJSON
+
+    def is_stream_requested(self, parsed_args):
+        """
+        Check if client asks for streamed list by `stream` arg
+        or by NDJSON in Accept header.
+        :param parsed_args: dict with parsed args (from request)
+        :rtype: bool
+        """
+
+        return parsed_args.get("stream") in ("1", "true") \
+            or self.accepts_ndjson()
+
+    def make_stream_response(self, query):
+        """
+        Stream query rows serialized one by one. Rows are fetched
+        by batches and sent by chunks, so memory usage doesn't
+        depend on rows count. NDJSON is used if client accepts it,
+        otherwise rows are sent as JSON array.
+        :param query: sqlalchemy query
+        :rtype: Response
+        """
+
+        chunk_size = current_app.config.get("API_STREAM_CHUNK_SIZE")
+        ndjson = self.accepts_ndjson()
+        serializer = self.get_serializer()
+
+        def generate():
+            if not ndjson:
+                yield "["
+
+            chunk = []
+            for index, item in enumerate(query.yield_per(chunk_size)):
+                row = json.dumps(serializer.dump(item).data)
+
+                if ndjson:
+                    chunk.append(row + "\n")
+                else:
+                    chunk.append("," + row if index else row)
+
+                if len(chunk) >= chunk_size:
+                    yield "".join(chunk)
+                    chunk = []
+
+            if chunk:
+                yield "".join(chunk)
+
+            if not ndjson:
+                yield "]"
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype=APPLICATION_NDJSON if ndjson else APPLICATION_JSON,
+        )
+
+    def get_validators(self, payload):
+        """
+        Build weak ETag and Last-Modified headers from objects
+        (id, updated_at) pairs without serializing them.
+        Lists have only ETag, deleted rows don't change max updated_at
+        of the page, but change its ids.
+        :param payload: model instance or list of instances
+        :rtype: dict
+        """
+
+        many = isinstance(payload, list)
+        items = payload if many else [payload]
+
+        if not all(hasattr(item, "updated_at") for item in items):
+            return {}
+
+        fingerprint = hashlib.md5(self.serializer.__name__.encode())
+        fingerprint.update(repr(self.only_fields).encode())
+        fingerprint.update(self.get_mimetype().encode())
+        for item in items:
+            fingerprint.update(f"|{item.id}:{item.updated_at}".encode())
+
+        headers = {"ETag": quote_etag(fingerprint.hexdigest(), weak=True)}
+
+        if not many and payload.updated_at:
+            headers["Last-Modified"] = http_date(payload.updated_at)
+
+        return headers
+
+    @staticmethod
+    def is_fresh(headers):
+        """
+        Check client copy by If-None-Match, or by If-Modified-Since
+        when request has no ETags.
+        :param dict headers: response validators headers
+        :rtype: bool
+        """
+
+        if "ETag" not in headers:
+            return False
+
+        if request.if_none_match:
+            etag, _ = unquote_etag(headers["ETag"])
+            return request.if_none_match.contains_weak(etag)
+
+        if request.if_modified_since and "Last-Modified" in headers:
+            last_modified = parse_date(headers["Last-Modified"])
+            return last_modified.replace(tzinfo=None) <= \
+                request.if_modified_since.replace(tzinfo=None)
+
+        return False
+
+    def make_response(self, payload=None, status_code=200, message=None,
+                      headers=None):
         """
         :param payload: Data payload.
         :param status_code: Response status code.
         :param message: Response message.
+        :param headers: Response headers.
         """
 
-        if isinstance(payload, list) or isinstance(payload, set):
-            payload = [
-                self.serializer().dump(item).data
-                for item in payload
-            ]
+        if isinstance(payload, set):
+            payload = list(payload)
+
+        if request.method == "GET" and status_code == 200 and payload:
+            headers = dict(headers or {}, **self.get_validators(payload))
+
+            if self.is_fresh(headers):
+                return Response(status=304, headers=headers)
+
+        if isinstance(payload, list):
+            payload = self.get_serializer(many=True).dump(payload).data
         else:
-            payload = self.serializer().dump(payload).data \
+            payload = self.get_serializer().dump(payload).data \
                 if payload else dict()
 
         if message:
             payload["message"] = message
+
+        if headers:
+            return payload, status_code, headers
         return payload, status_code
 
 
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from marshmallow import Schema, pre_load, ValidationError
 from marshmallow.fields import Str, Nested
 
@@ -42,3 +44,18 @@ class BadRequestSchema(Schema):
     """ Schema for bad authorization """
 
     message = Nested(ErrorFieldSchema, many=True)
+
+
+@lru_cache(maxsize=256)
+def get_schema(schema_class, many=False, only=None):
+    """
+    Get shared schema instance, schema construction is much
+    more expensive than dump, so instances are built once
+    per schema class and fields set.
+    :param schema_class: schema class
+    :param bool many: serialize collections
+    :param tuple only: serialized fields, all fields if None
+    :return: schema instance
+    """
+
+    return schema_class(many=many, only=only)
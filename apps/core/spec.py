@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+
+from click import echo, option
+from flask import current_app, request, Response
+
+from apps import spec_cli
+
+SPEC_ENDPOINT = "apispec_1"
+
+
+def render_spec(app):
+    """
+    Render OpenAPI spec by flasgger views introspection.
+    :param app: Flask app
+    :rtype: dict
+    """
+
+    with app.test_request_context():
+        return app.swag.get_apispecs(SPEC_ENDPOINT)
+
+
+def get_spec_file(app):
+    """
+    Versioned spec file path.
+    :param app: Flask app
+    :rtype: str
+    """
+
+    return os.path.join(
+        app.config.get("SPEC_DIR"),
+        f"apispec_v{app.config.get('API_VERSION')}.json",
+    )
+
+
+class PrecomputedSpec(object):
+    """
+    Serve spec built by `flask spec build` from memory
+    with strong ETag instead of flasgger introspection.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.etag = hashlib.sha256(data).hexdigest()
+
+    @classmethod
+    def init_app(cls, app):
+        """
+        Load spec file and register its url before flasgger one.
+        :param app: Flask app
+        :return: loaded spec or None if it isn't built
+        """
+
+        if not app.config.get("SPEC_PRECOMPUTED"):
+            return None
+
+        path = get_spec_file(app)
+
+        if not os.path.exists(path):
+            app.logger.warning(
+                "Spec file %s isn't built, spec is served by flasgger.",
+                path,
+            )
+            return None
+
+        with open(path, "rb") as file:
+            spec = cls(file.read())
+
+        app.extensions["precomputed_spec"] = spec
+        app.add_url_rule(f"/{SPEC_ENDPOINT}.json", "apispec", spec.view)
+        return spec
+
+    def view(self):
+        # weak comparison, compressed response has weak ETag
+        if request.if_none_match.contains_weak(self.etag):
+            response = Response(status=304)
+        else:
+            response = Response(self.data, mimetype="application/json")
+
+        response.set_etag(self.etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config.get(
+            "SPEC_MAX_AGE",
+        )
+        return response
+
+
+@spec_cli.command("build")
+@option("--output", help="Spec file path, versioned file in SPEC_DIR "
+                         "by default.")
+def build_spec(output):
+    """
+    Render OpenAPI spec to JSON file served by production app.
+    Usage: flask spec build
+    """
+
+    app = current_app._get_current_object()
+    output = output or get_spec_file(app)
+    data = json.dumps(render_spec(app), sort_keys=True).encode()
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "wb") as file:
+        file.write(data)
+
+    echo(f"Spec was written to {output}, "
+         f"sha256 {hashlib.sha256(data).hexdigest()}.")
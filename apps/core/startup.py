@@ -0,0 +1,128 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+import click
+from click import echo, option
+
+from apps.config import PROJECT_DIR
+
+# cold start app in separate process and print its timings
+PROFILE_CODE = (
+    "import sys, time; started = time.perf_counter(); "
+    "from apps.core.startup import main; main(sys.argv[1], started)"
+)
+
+
+class StartupTimer(object):
+    """ Collect create_app phases durations. """
+
+    def __init__(self):
+        self.timings = []
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        yield
+        self.timings.append((name, time.perf_counter() - started))
+
+
+def is_cli_command(name):
+    """
+    Check if app is created by flask CLI to run given command.
+    :param str name: top level command name
+    :rtype: bool
+    """
+
+    ctx = click.get_current_context(silent=True)
+
+    # app is loaded while resolving command or inside its context
+    while ctx is not None:
+        if ctx.info_name == name or ctx.protected_args[:1] == [name]:
+            return True
+        ctx = ctx.parent
+
+    return False
+
+
+def parse_importtime(output, limit):
+    """
+    Slowest imports by cumulative time from `-X importtime` output.
+    :param str output: stderr of python process
+    :param int limit: returned imports count
+    :return: (module, self us, cumulative us) tuples
+    :rtype: list
+    """
+
+    imports = []
+
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_time, cumulative, module = line[len("import time:"):]\
+            .split("|")
+        imports.append((module.strip(), int(self_time), int(cumulative)))
+
+    return sorted(imports, key=lambda item: item[2], reverse=True)[:limit]
+
+
+@click.command("startup-profile")
+@option("--env", default=os.getenv("ENV") or "production",
+        help="Config environment of profiled app.")
+@option("--limit", default=20, help="Slowest imports count.")
+def startup_profile(env, limit):
+    """
+    Report imports and create_app phases time of cold started app.
+    Usage: flask startup-profile
+    """
+
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROFILE_CODE, env],
+        cwd=PROJECT_DIR,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+
+    if process.returncode:
+        echo(process.stderr, err=True)
+        sys.exit(1)
+
+    report = json.loads(process.stdout.splitlines()[-1])
+
+    echo(f"{'import':<50} {'self, ms':>9} {'total, ms':>10}")
+    for module, self_time, cumulative in parse_importtime(
+            process.stderr, limit):
+        echo(f"{module:<50} {self_time / 1000:>9.1f} "
+             f"{cumulative / 1000:>10.1f}")
+
+    echo(f"\n{'create_app phase':<50} {'ms':>9}")
+    for name, duration in report["phases"]:
+        echo(f"{name:<50} {duration * 1000:>9.1f}")
+
+    echo(f"\nimport apps: {report['import'] * 1000:.1f} ms, "
+         f"create_app: {report['create_app'] * 1000:.1f} ms")
+
+
+def main(env, started):
+    """
+    Create app and print timings as JSON line.
+    :param str env: config environment
+    :param float started: process start perf counter
+    """
+
+    from apps import create_app
+    from apps.config import config_mapping
+    imported = time.perf_counter()
+    app = create_app(config_mapping[env])
+    created = time.perf_counter()
+
+    print(json.dumps({
+        "import": imported - started,
+        "create_app": created - imported,
+        "phases": app.extensions["startup_timer"].timings,
+    }))
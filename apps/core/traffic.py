@@ -0,0 +1,473 @@
+import base64
+import datetime
+import hashlib
+import http.client
+import io
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import WatchedFileHandler
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import jwt as pyjwt
+from click import argument, echo, option, Path
+from flask import current_app
+from flask_jwt_extended import create_access_token
+
+from apps import loadtest_cli
+from apps.core.constants import APPLICATION_JSON, AUTHORIZATION_HEADER
+from apps.core.filters import DATETIME_FORMATS, TRUE_VALUES, FALSE_VALUES
+from apps.core.pagination import encode_cursor
+from apps.logs import start_queue_listener
+from apps.users.commands import SEED_PASSWORD
+from apps.users.models import User
+
+# query args which values are recorded, others are recorded as shapes
+RAW_VALUE_ARGS = ("limit", "page", "count", "sort", "fields", "stream")
+# replayed datetime values are seconds after it by request number
+REPLAY_EPOCH = datetime.datetime(2020, 1, 1)
+LOGIN_ENDPOINT = "api_v1.user_login"
+# local users checked for password of replayed logins
+LOGIN_USERS_LIMIT = 16
+
+
+def get_shape(value):
+    """
+    Replace JSON values by type names, keeping structure.
+    :param value: loaded JSON value
+    """
+
+    if isinstance(value, dict):
+        return {key: get_shape(item) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [get_shape(value[0])] if value else []
+
+    if value is None:
+        return "null"
+
+    return type(value).__name__
+
+
+def get_str_shape(value):
+    """
+    Shape of string value, datetime in filters format is kept apart.
+    :param str value: string value
+    """
+
+    for date_format in DATETIME_FORMATS:
+        try:
+            datetime.datetime.strptime(value, date_format)
+            return "datetime"
+        except ValueError:
+            continue
+
+    return "str"
+
+
+def get_cursor_shape(value):
+    """
+    Shapes of pagination cursor values.
+    :param str value: query arg value
+    :return: values shapes or None if value isn't cursor
+    """
+
+    try:
+        values = json.loads(
+            base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)),
+        )
+    except (ValueError, TypeError):
+        return None
+
+    if not isinstance(values, list):
+        return None
+
+    return [
+        get_str_shape(item) if isinstance(item, str) else get_shape(item)
+        for item in values
+    ]
+
+
+def get_arg_shape(value):
+    """
+    Shape of query arg value, which is always string: bool, int,
+    datetime, cursor with its values shapes or str.
+    :param str value: query arg value
+    """
+
+    if value.lower() in TRUE_VALUES + FALSE_VALUES:
+        return "bool"
+
+    if value.isdigit():
+        return "int"
+
+    cursor = get_cursor_shape(value)
+
+    if cursor is not None:
+        return {"cursor": cursor}
+
+    return get_str_shape(value)
+
+
+def build_arg(shape, key, index):
+    """
+    Build query arg value of shape recorded by get_arg_shape.
+    :param shape: value shape
+    :param str key: query arg name
+    :param int index: replayed request number
+    """
+
+    if isinstance(shape, dict):
+        return encode_cursor(
+            [build_value(item, key, index) for item in shape["cursor"]],
+        )
+
+    value = build_value(shape, key, index)
+
+    if isinstance(value, bool):
+        return str(value).lower()
+
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+
+    return value
+
+
+def build_value(shape, key, index):
+    """
+    Build JSON value of given shape, strings are unique by index.
+    :param shape: value shape recorded by get_shape
+    :param str key: parent dict key
+    :param int index: replayed request number
+    """
+
+    if isinstance(shape, dict):
+        return {name: build_value(item, name, index)
+                for name, item in shape.items()}
+
+    if isinstance(shape, list):
+        return [build_value(shape[0], key, index)] if shape else []
+
+    if shape == "str":
+        if "email" in key:
+            return f"replay_{index}@example.com"
+        return f"replay_{key}_{index}"
+
+    if shape == "datetime":
+        return REPLAY_EPOCH + datetime.timedelta(seconds=index)
+
+    return {"int": index, "float": float(index), "bool": True}.get(shape)
+
+
+class TrafficRecorder(object):
+    """
+    WSGI middleware writing sanitized requests to JSONL file:
+    method, path, allowed query values and other query args shapes,
+    JSON body shape without values, auth identity alias, response status
+    and duration. Lines are written by background log listener.
+    """
+
+    def __init__(self, app):
+        """
+        :param app: Flask app, its wsgi_app is wrapped
+        """
+
+        config = app.config
+        self.wsgi_app = app.wsgi_app
+        handler = WatchedFileHandler(config["TRAFFIC_RECORD_FILE"])
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.queue_handler, _ = start_queue_listener(app, handler)
+        self.secret = config.get("SECRET_KEY") or ""
+        self.identity_claim = config.get("JWT_IDENTITY_CLAIM", "identity")
+        self.sample_rate = config.get("TRAFFIC_RECORD_SAMPLE_RATE", 1.0)
+
+    def get_alias(self, authorization):
+        """
+        Stable alias of token identity, identity itself isn't recorded.
+        :param str authorization: Authorization header value
+        :return: alias or None
+        """
+
+        try:
+            claims = pyjwt.decode(authorization.split()[-1], verify=False)
+        except (pyjwt.InvalidTokenError, IndexError):
+            return None
+
+        identity = claims.get(self.identity_claim)
+        return hashlib.sha256(
+            f"{self.secret}:{identity}".encode(),
+        ).hexdigest()[:12]
+
+    def get_body_shape(self, environ):
+        """
+        Read request body, put it back for app and return its shape.
+        :param dict environ: WSGI environ
+        """
+
+        length = int(environ.get("CONTENT_LENGTH") or 0)
+
+        if not length:
+            return None
+
+        body = environ["wsgi.input"].read(length)
+        environ["wsgi.input"] = io.BytesIO(body)
+
+        raw = {"content_type": environ.get("CONTENT_TYPE"), "size": length}
+
+        if not environ.get("CONTENT_TYPE", "").startswith(APPLICATION_JSON):
+            return {"raw": raw}
+
+        try:
+            return {"json": get_shape(json.loads(body))}
+        except ValueError:
+            return {"raw": raw}
+
+    def __call__(self, environ, start_response):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.wsgi_app(environ, start_response)
+
+        authorization = environ.get("HTTP_AUTHORIZATION")
+        query = parse_qsl(environ.get("QUERY_STRING", ""))
+        record = {
+            "ts": round(time.time(), 3),
+            "method": environ["REQUEST_METHOD"],
+            "path": environ.get("PATH_INFO", ""),
+            "query": {
+                key: value for key, value in query if key in RAW_VALUE_ARGS
+            },
+            "query_shape": {
+                key: get_arg_shape(value)
+                for key, value in query if key not in RAW_VALUE_ARGS
+            },
+            "accept": environ.get("HTTP_ACCEPT"),
+            "body": self.get_body_shape(environ),
+            "auth": self.get_alias(authorization) if authorization else None,
+        }
+        started = time.perf_counter()
+
+        def recording_start_response(status, headers, exc_info=None):
+            record["status"] = int(status.split()[0])
+            return start_response(status, headers, exc_info)
+
+        try:
+            return self.wsgi_app(environ, recording_start_response)
+        finally:
+            record["duration_ms"] = round(
+                (time.perf_counter() - started) * 1000, 2,
+            )
+            self.queue_handler.handle(
+                logging.makeLogRecord({"msg": json.dumps(record)}),
+            )
+
+
+def percentile(values, percent):
+    """
+    Nearest rank percentile.
+    :param list values: sorted values
+    :param int percent: percentile
+    """
+
+    return values[max(0, -(-len(values) * percent // 100) - 1)]
+
+
+def get_tokens(aliases):
+    """
+    Mint access tokens for recorded identities aliases,
+    aliases are mapped to local active users by turn.
+    :param aliases: identities aliases
+    :return: alias to token map
+    :rtype: dict
+    """
+
+    if not aliases:
+        return {}
+
+    users = User.query.filter_by(is_active=True).order_by(User.id)\
+        .limit(len(aliases)).all()
+
+    if not users:
+        echo("No active users to mint tokens for.", err=True)
+        sys.exit(1)
+
+    return {
+        alias: create_access_token(identity=users[index % len(users)].id)
+        for index, alias in enumerate(sorted(aliases))
+    }
+
+
+def get_credentials(password):
+    """
+    Local active users with given password, replayed logins use them,
+    recorded credentials aren't known.
+    :param str password: users password, e.g. seeded users one
+    :return: login payloads
+    :rtype: list
+    """
+
+    users = User.query.filter_by(is_active=True).order_by(User.id)\
+        .limit(LOGIN_USERS_LIMIT).all()
+
+    return [
+        {"login": user.login, "password": password}
+        for user in users if user.check_password(password)
+    ]
+
+
+def build_requests(records, tokens, header_type, login_path=None,
+                   credentials=()):
+    """
+    Build replayed requests from records.
+    :param list records: recorded requests
+    :param dict tokens: alias to token map
+    :param str header_type: JWT header type
+    :param str login_path: login url path
+    :param list credentials: login payloads for replayed logins
+    :return: (method, url, body, headers) tuples
+    :rtype: list
+    """
+
+    requests = []
+
+    for index, record in enumerate(records):
+        url = record["path"]
+        query = dict(record.get("query") or {})
+        query.update({
+            key: build_arg(shape, key, index)
+            for key, shape in (record.get("query_shape") or {}).items()
+        })
+        if query:
+            url += "?" + urlencode(query)
+
+        headers = {}
+        if record.get("accept"):
+            headers["Accept"] = record["accept"]
+        if record.get("auth"):
+            headers[AUTHORIZATION_HEADER] = \
+                f"{header_type} {tokens[record['auth']]}"
+
+        body = None
+        shape = record.get("body") or {}
+        if "json" in shape:
+            value = build_value(shape["json"], "", index)
+            if record["path"] == login_path and isinstance(value, dict) \
+                    and credentials:
+                value.update(credentials[index % len(credentials)])
+            body = json.dumps(value)
+            headers["Content-Type"] = APPLICATION_JSON
+        elif "raw" in shape:
+            # raw body content isn't recorded, only its size
+            body = b"\0" * shape["raw"]["size"]
+            headers["Content-Type"] = shape["raw"]["content_type"]
+
+        requests.append((record["method"], url, body, headers))
+
+    return requests
+
+
+def replay_requests(requests, url, concurrency):
+    """
+    Send requests by concurrent keep-alive connections.
+    :param list requests: (method, url, body, headers) tuples
+    :param str url: target base url
+    :param int concurrency: concurrent connections count
+    :return: (status, latency ms) results and elapsed seconds
+    :rtype: tuple
+    """
+
+    target = urlsplit(url)
+    local = threading.local()
+
+    def send(item):
+        method, path, body, headers = item
+
+        if not hasattr(local, "connection"):
+            local.connection = http.client.HTTPConnection(
+                target.hostname, target.port or 80, timeout=30,
+            )
+
+        started = time.perf_counter()
+        try:
+            local.connection.request(method, path, body, headers)
+            response = local.connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            local.connection.close()
+            del local.connection
+            status = None
+
+        return status, (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(send, requests))
+
+    return results, time.perf_counter() - started
+
+
+@loadtest_cli.command("replay")
+@argument("path", type=Path(exists=True, dir_okay=False))
+@option("--concurrency", default=10, help="Concurrent connections.")
+@option("--url", default="http://127.0.0.1:5000", help="Target app url.")
+@option("--login-password", default=f"{SEED_PASSWORD}0",
+        help="Password of local users signed in by replayed logins.")
+def replay(path, concurrency, url, login_password):
+    """
+    Replay recorded requests against running app, e.g. gunicorn
+    started with GUNICORN_BIND=127.0.0.1:5000, and report throughput,
+    latency percentiles and errors rate. Logins are replayed for local
+    users with login password, by default seeded users one.
+    Usage: flask loadtest replay traffic.jsonl --concurrency 20
+    """
+
+    with open(path) as file:
+        records = [json.loads(line) for line in file if line.strip()]
+
+    if not records:
+        echo("No recorded requests.", err=True)
+        sys.exit(1)
+
+    tokens = get_tokens({item["auth"] for item in records if item["auth"]})
+    login_path = next(
+        current_app.url_map.iter_rules(LOGIN_ENDPOINT),
+    ).rule
+    credentials = []
+
+    if any(item["path"] == login_path and item.get("body")
+           for item in records):
+        credentials = get_credentials(login_password)
+
+        if not credentials:
+            echo("No active users with login password.", err=True)
+            sys.exit(1)
+
+    requests = build_requests(
+        records,
+        tokens,
+        current_app.config.get("JWT_HEADER_TYPE"),
+        login_path,
+        credentials,
+    )
+    results, elapsed = replay_requests(requests, url, concurrency)
+
+    latencies = sorted(latency for _, latency in results)
+    statuses = Counter(status for status, _ in results)
+    errors = sum(count for status, count in statuses.items()
+                 if status is None or status >= 400)
+
+    echo(f"Requests: {len(results)}, concurrency: {concurrency}, "
+         f"elapsed: {elapsed:.2f} s")
+    echo(f"Throughput: {len(results) / elapsed:.1f} req/s")
+    echo(f"Latency ms: p50 {percentile(latencies, 50):.2f}, "
+         f"p95 {percentile(latencies, 95):.2f}, "
+         f"p99 {percentile(latencies, 99):.2f}, max {latencies[-1]:.2f}")
+    echo(f"Errors: {errors} ({errors / len(results) * 100:.1f}%)")
+    echo("Statuses: " + ", ".join(
+        f"{status or 'failed'}: {count}"
+        for status, count in sorted(statuses.items(), key=str)
+    ))
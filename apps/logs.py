@@ -1,20 +1,340 @@
+import atexit
+import copy
+import datetime
+import importlib
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import random
+import time
+import uuid
+from logging.handlers import WatchedFileHandler, QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+
+from apps.core.queries import SLOW_QUERY_LOGGER
+
+try:
+    from gevent import monkey
+    from gevent.threadpool import ThreadPool
+except ImportError:
+    monkey = ThreadPool = None
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+_formatter = logging.Formatter()
+
+
+def get_native(module, name):
+    """
+    Get standard library object as it was before gevent patching.
+    :param str module: module name
+    :param str name: object name
+    """
+
+    if monkey is None:
+        return getattr(importlib.import_module(module), name)
+
+    return monkey.get_original(module, name)
+
+
+def make_log_queue():
+    """
+    Unbounded queue with native locks, which listener thread can wait
+    on also under gevent. Size is limited by DroppingQueueHandler.
+    :rtype: queue.SimpleQueue
+    """
+
+    return get_native("queue", "SimpleQueue")()
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Queue handler which never blocks: records are dropped
+    when queue is full or has maxsize records. Dropped records count
+    is attached to the next queued record.
+    """
+
+    def __init__(self, log_queue, maxsize=0):
+        """
+        :param log_queue: records queue
+        :param int maxsize: max queued records, zero is unlimited
+        """
+
+        super().__init__(log_queue)
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record):
+        """
+        Merge message args and format exception to exc_text,
+        the base method appends traceback to message instead.
+        """
+
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+
+        if record.exc_info:
+            record.exc_text = _formatter.formatException(record.exc_info)
+            record.exc_info = None
+
+        return record
+
+    def enqueue(self, record):
+        if self._unreported:
+            record.dropped = self._unreported
+
+        try:
+            if self.maxsize and self.queue.qsize() >= self.maxsize:
+                raise queue.Full
+
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+        else:
+            self._unreported = 0
+
+
+class NativeQueueListener(QueueListener):
+    """
+    Queue listener which writes records by native thread also under
+    gevent, so file writes and rotation don't block the hub.
+    Queue must have native locks, see make_log_queue.
+    """
+
+    def __init__(self, log_queue, *handlers, **kwargs):
+        super().__init__(log_queue, *handlers, **kwargs)
+        self.running = False
+        self._pool = None
+
+        # handlers are used by listener thread only
+        for handler in handlers:
+            handler.lock = get_native("threading", "RLock")()
+
+    def start(self):
+        self.running = True
+
+        if ThreadPool is None or not monkey.is_module_patched("threading"):
+            return super().start()
+
+        # patched threading.Thread runs in greenlet, pool thread is native
+        self._pool = ThreadPool(1)
+        self._thread = self._pool.spawn(self._monitor)
+
+    def stop(self):
+        self.running = False
+
+        if self._pool is None:
+            return super().stop()
+
+        self.enqueue_sentinel()
+        self._thread.get()
+        self._pool.kill()
+        self._pool = self._thread = None
+
+
+class RequestContextFilter(logging.Filter):
+    """ Add current request id, method, path and latency to record. """
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = g.get("request_id")
+            record.method = request.method
+            record.path = request.path
+            started = g.get("request_started")
+            if started is not None:
+                record.latency_ms = round(
+                    (time.perf_counter() - started) * 1000, 2,
+                )
+
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """ Pass only sample_rate part of records below WARNING level. """
+
+    def __init__(self, sample_rate):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING \
+            or self.sample_rate >= 1 \
+            or random.random() < self.sample_rate
+
+
+class JsonFormatter(logging.Formatter):
+    """ Format record as one JSON line. """
+
+    fields = ("request_id", "method", "path", "latency_ms", "dropped")
+
+    def format(self, record):
+        data = {
+            "time": datetime.datetime.utcfromtimestamp(record.created)
+            .isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "source": f"{record.pathname}:{record.lineno}",
+            "message": record.getMessage(),
+        }
+
+        for field in self.fields:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+
+        # exception is formatted to exc_text before it's queued
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+
+        if record.exc_text:
+            data["exc_info"] = record.exc_text
+
+        return json.dumps(data, default=str)
+
+
+def get_queued_handler(app, handler):
+    """
+    Wrap handler to queue, records are written by listener thread.
+    :param app: Flask app
+    :param handler: target logging handler
+    :return: queue handler and started listener
+    :rtype: tuple
+    """
+
+    handler.setFormatter(JsonFormatter())
+    queue_handler, listener = start_queue_listener(app, handler)
+    queue_handler.addFilter(
+        SamplingFilter(app.config.get("LOG_SAMPLE_RATE", 1.0)),
+    )
+    queue_handler.addFilter(RequestContextFilter())
+    return queue_handler, listener
+
+
+def start_queue_listener(app, handler):
+    """
+    Write records of returned queue handler by background listener,
+    listeners are restarted in forked workers and stopped at exit.
+    :param app: Flask app
+    :param handler: target logging handler
+    :return: queue handler and started listener
+    :rtype: tuple
+    """
+
+    queue_handler = DroppingQueueHandler(
+        make_log_queue(), app.config.get("LOG_QUEUE_SIZE", 10000),
+    )
+    listener = NativeQueueListener(queue_handler.queue, handler)
+    listener.start()
+
+    if "log_listeners" not in app.extensions:
+        app.extensions["log_listeners"] = {}
+        atexit.register(stop_listeners, app)
+
+    app.extensions["log_listeners"][queue_handler] = listener
+    return queue_handler, listener
+
+
+def stop_listener(listener):
+    """ Write queued records and stop listener if it is running. """
+
+    if listener.running:
+        listener.stop()
+
+
+def stop_listeners(app):
+    """
+    Write queued records of app log listeners at exit.
+    :param app: Flask app
+    """
+
+    for listener in app.extensions.get("log_listeners", {}).values():
+        stop_listener(listener)
+
+
+def start_listeners(app):
+    """
+    Start new log queues and writers in forked worker, listener threads
+    started before fork don't exist in it and queued records are written
+    by master. File handlers are reused.
+    :param app: Flask app
+    :return: started queue listeners
+    :rtype: list
+    """
+
+    listeners = app.extensions.get("log_listeners", {})
+
+    for queue_handler, inherited in listeners.items():
+        queue_handler.queue = make_log_queue()
+        listeners[queue_handler] = NativeQueueListener(
+            queue_handler.queue, *inherited.handlers,
+        )
+        listeners[queue_handler].start()
+
+    return list(listeners.values())
+
+
+def set_request_id():
+    g.request_started = time.perf_counter()
+    g.request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+
+
+def add_request_id_header(response):
+    if g.get("request_id"):
+        response.headers[REQUEST_ID_HEADER] = g.request_id
+    return response
 
 
 def setup_logs(app):
-    logdir = app.config.get("APP_LOGDIR", "./logs/")
+    """
+    Write app logs as JSON lines by background thread.
+    Workers append to the same files, they are rotated outside app,
+    e.g. by logrotate, and reopened when moved.
+    :param app: Flask app
+    :return: started queue listeners
+    :rtype: list
+    """
+
+    logdir = app.config.get("APP_LOGDIR") or "./logs/"
     if not os.path.exists(logdir):
         os.mkdir(logdir)
-    formatter = logging.Formatter(
-        "[%(asctime)s] {%(pathname)s:%(lineno)d}"
-        "%(levelname)s - %(message)s",
-    )
-    handler = RotatingFileHandler(
-        app.config.get("APP_LOGFILE"), mode="w",
-        maxBytes=10000000, backupCount=5,
+    handler = WatchedFileHandler(
+        app.config.get("APP_LOGFILE") or os.path.join(logdir, "app.log"),
     )
     handler.setLevel(logging.DEBUG)
-    handler.setFormatter(formatter)
-    app.logger.addHandler(handler)
+    queue_handler, listener = get_queued_handler(app, handler)
+    app.logger.addHandler(queue_handler)
+    app.logger.setLevel(app.config.get("LOG_LEVEL", "INFO"))
+
+    app.before_request(set_request_id)
+    app.after_request(add_request_id_header)
+
+    setup_slow_query_log(app, queue_handler)
+    return list(app.extensions["log_listeners"].values())
+
+
+def setup_slow_query_log(app, app_handler):
+    """
+    Write slow SQL statements to separate file,
+    or to app log when file isn't configured.
+    :param app: Flask app
+    :param app_handler: queue handler of app log
+    :return: started queue listener or None
+    """
+
+    logfile = app.config.get("APP_SLOW_QUERY_LOGFILE")
+    logger = logging.getLogger(SLOW_QUERY_LOGGER)
+    logger.setLevel(logging.WARNING)
+
+    if not logfile:
+        logger.addHandler(app_handler)
+        return None
+
+    handler = WatchedFileHandler(logfile)
+    queue_handler, listener = get_queued_handler(app, handler)
+    logger.addHandler(queue_handler)
+    return listener
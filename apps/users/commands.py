@@ -1,10 +1,48 @@
+import csv
+import datetime
+import json
+import multiprocessing
+import os
+import random
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 
-from click import prompt, echo
+from click import (
+    prompt, echo, argument, option, Path, Choice, IntRange,
+)
+from flask import current_app
+from sqlalchemy import or_
+from werkzeug.security import generate_password_hash
 
-from apps import superuser_cli
+from apps import db, superuser_cli, users_cli
+from apps.core.bulk import bulk_insert
 from apps.users.constants import USER_ALREADY_EXIST
 from apps.users.models import User
+from apps.users.schemes import UserImportSchema
+
+SEED_FIRST_NAMES = (
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael",
+    "Linda", "David", "Elizabeth", "William", "Barbara", "Richard", "Susan",
+    "Joseph", "Jessica", "Thomas", "Sarah", "Daniel", "Karen", "Olga",
+    "Ivan", "Anna", "Dmitry", "Maria", "Pedro", "Lucia", "Hiro", "Yuki",
+)
+SEED_LAST_NAMES = (
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller",
+    "Davis", "Rodriguez", "Martinez", "Wilson", "Anderson", "Taylor",
+    "Thomas", "Moore", "Jackson", "Martin", "Lee", "Thompson", "White",
+    "Petrov", "Ivanova", "Kovalenko", "Silva", "Tanaka", "Sato", "Muller",
+)
+SEED_DOMAINS = ("example.com", "example.org", "example.net")
+# seeded users creation dates are spread over a year before it
+SEED_EPOCH = datetime.datetime(2019, 1, 1)
+SEED_PERIOD = 365 * 24 * 3600
+# seeded users passwords are password0..passwordN
+SEED_PASSWORD = "password"
+
+# state of seeding worker process
+_seed_worker = {}
 
 
 @superuser_cli.command("create")
@@ -36,3 +74,308 @@ def create_admin_user():
     User(**data).save()
     echo("Superuser was successfully created.")
     sys.exit(0)
+
+
+def read_rows(path, file_format):
+    """
+    Stream rows from CSV or NDJSON file.
+    :param str path: file path
+    :param str file_format: csv or ndjson
+    :return: rows generator
+    """
+
+    with open(path, newline="") as file:
+        if file_format == "csv":
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def get_unknown_columns(path):
+    """
+    CSV header columns which aren't import schema fields.
+    :param str path: CSV file path
+    :rtype: list
+    """
+
+    with open(path, newline="") as file:
+        header = next(csv.reader(file), [])
+
+    return sorted(set(header) - set(UserImportSchema().fields))
+
+
+def load_chunk(chunk):
+    """
+    Validate chunk rows. Schema level error, e.g. unknown field
+    of one row, fails the whole chunk, then rows are loaded one
+    by one, so errors are reported by row.
+    :param list chunk: raw rows
+    :return: loaded rows and errors by row index
+    :rtype: tuple
+    """
+
+    data, errors = UserImportSchema(many=True).load(chunk)
+
+    if all(isinstance(index, int) for index in errors):
+        return data, errors
+
+    schema = UserImportSchema()
+    data, errors = [], {}
+
+    for index, row in enumerate(chunk):
+        item, row_errors = schema.load(row)
+        data.append(item)
+
+        if row_errors:
+            errors[index] = row_errors
+
+    return data, errors
+
+
+def filter_unique(data):
+    """
+    Drop rows which login or email is already used in database
+    or in previous rows of the chunk. Checked by one query.
+    :param list data: loaded rows
+    :return: unique rows and duplicates count
+    :rtype: tuple
+    """
+
+    logins = {item["login"] for item in data}
+    emails = {item["email"] for item in data}
+    used = db.session.query(User.login, User.email).filter(
+        or_(User.login.in_(logins), User.email.in_(emails)),
+    ).all()
+    used_logins = {login for login, _ in used}
+    used_emails = {email for _, email in used}
+    unique = []
+
+    for item in data:
+        if item["login"] in used_logins or item["email"] in used_emails:
+            continue
+
+        used_logins.add(item["login"])
+        used_emails.add(item["email"])
+        unique.append(item)
+
+    return unique, len(data) - len(unique)
+
+
+def generate_users(seed, start, stop, hashes):
+    """
+    Generate users with indexes in [start, stop) range,
+    same seed and index always give same user.
+    :param int seed: random seed
+    :param int start: first user index
+    :param int stop: last user index + 1
+    :param list hashes: precomputed password hashes
+    :return: rows generator
+    """
+
+    for index in range(start, stop):
+        rnd = random.Random(f"{seed}:{index}")
+        first_name = rnd.choice(SEED_FIRST_NAMES)
+        last_name = rnd.choice(SEED_LAST_NAMES)
+        # index suffix keeps login and email unique
+        login = f"{first_name}.{last_name}.{index}".lower()
+        created_at = SEED_EPOCH - datetime.timedelta(
+            seconds=rnd.randrange(SEED_PERIOD),
+        )
+
+        yield {
+            "login": login,
+            "password": hashes[rnd.randrange(len(hashes))],
+            "name": f"{first_name} {last_name}",
+            "email": f"{login}@{rnd.choice(SEED_DOMAINS)}",
+            "is_active": rnd.random() < 0.9,
+            "is_admin": False,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+
+def init_seed_worker(app, hashes):
+    """
+    Push app context in forked seeding process.
+    :param app: Flask app
+    :param list hashes: precomputed password hashes
+    """
+
+    app.app_context().push()
+    _seed_worker["hashes"] = hashes
+
+
+def seed_batch(seed, start, stop, hashes=None):
+    """
+    Insert generated users batch by its own transaction.
+    :return: inserted rows count
+    :rtype: int
+    """
+
+    bulk_insert(User.__table__, list(generate_users(
+        seed, start, stop, hashes or _seed_worker["hashes"],
+    )))
+    db.session.commit()
+    return stop - start
+
+
+@users_cli.command("import")
+@argument("path", type=Path(exists=True, dir_okay=False))
+@option("--format", "file_format", type=Choice(["csv", "ndjson"]),
+        help="Input format, detected by file extension by default.")
+@option("--chunk-size", default=1000, help="Rows validated and inserted "
+                                           "at once.")
+@option("--workers", default=os.cpu_count(), help="Password hashing "
+                                                  "processes.")
+@option("--checkpoint", help="Checkpoint file, PATH.checkpoint by default.")
+def import_users(path, file_format, chunk_size, workers, checkpoint):
+    """
+    Import users from CSV or NDJSON file. Rows are validated and
+    inserted by chunks, processed rows count is saved to checkpoint
+    file after every chunk, so failed import resumes from it.
+    Usage: flask users import users.csv
+    """
+
+    file_format = file_format or \
+        ("csv" if path.lower().endswith(".csv") else "ndjson")
+    checkpoint = checkpoint or f"{path}.checkpoint"
+    processed = 0
+
+    # same for all rows, so reported once for file
+    unknown = get_unknown_columns(path) if file_format == "csv" else []
+
+    if unknown:
+        echo("File error: " + " ".join(
+            f"Invalid field: {column}." for column in unknown
+        ), err=True)
+        sys.exit(1)
+
+    if os.path.exists(checkpoint):
+        with open(checkpoint) as file:
+            processed = int(file.read() or 0)
+        echo(f"Resuming import from row {processed + 1}.")
+
+    rows = islice(read_rows(path, file_format), processed, None)
+    executor = ProcessPoolExecutor(workers) if workers > 1 else None
+    hash_map = executor.map if executor else map
+    imported = skipped = 0
+    started = time.monotonic()
+
+    try:
+        while True:
+            chunk = list(islice(rows, chunk_size))
+
+            if not chunk:
+                break
+
+            data, errors = load_chunk(chunk)
+
+            for index, error in sorted(errors.items()):
+                echo(f"Row {processed + index + 1}: {error}", err=True)
+
+            data, duplicates = filter_unique(
+                [item for index, item in enumerate(data)
+                 if index not in errors],
+            )
+            now = datetime.datetime.utcnow()
+            hashes = hash_map(
+                generate_password_hash,
+                [item["password"] for item in data],
+            )
+
+            for item, password_hash in zip(data, hashes):
+                item.update({
+                    "password": password_hash,
+                    "is_admin": item.get("is_admin", False),
+                    "created_at": now,
+                    "updated_at": now,
+                })
+
+            bulk_insert(User.__table__, data)
+            db.session.commit()
+
+            processed += len(chunk)
+            imported += len(data)
+            skipped += len(errors) + duplicates
+
+            with open(checkpoint, "w") as file:
+                file.write(str(processed))
+    except Exception as error:
+        db.session.rollback()
+        echo(f"Import failed after row {processed}: {error}", err=True)
+        sys.exit(1)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    elapsed = time.monotonic() - started
+    echo(
+        f"Imported {imported} users, skipped {skipped}, "
+        f"{imported / elapsed if elapsed else imported:.0f} rows/s.",
+    )
+    sys.exit(0)
+
+
+@users_cli.command("seed")
+@option("--count", default=1000, type=IntRange(min=1),
+        help="Generated users count.")
+@option("--seed", default=0, help="Random seed, same seed gives "
+                                  "same users.")
+@option("--start", default=1, help="First user index, use next free one "
+                                   "to add users to seeded table.")
+@option("--batch-size", default=10000, help="Rows inserted at once.")
+@option("--workers", default=os.cpu_count(), help="Inserting processes.")
+@option("--passwords", default=8, help="Distinct passwords count.")
+def seed_users(count, seed, start, batch_size, workers, passwords):
+    """
+    Fill users table with generated users for scale testing.
+    Passwords are hashed once, users passwords are password0..passwordN.
+    Usage: flask users seed --count 1000000
+    """
+
+    hashes = [generate_password_hash(f"{SEED_PASSWORD}{index}")
+              for index in range(passwords)]
+    stop = start + count
+    batches = [(seed, index, min(index + batch_size, stop))
+               for index in range(start, stop, batch_size)]
+    executor = None
+    inserted = 0
+    started = time.monotonic()
+
+    if workers > 1:
+        # forked processes must not share parent connections
+        db.session.remove()
+        db.engine.dispose()
+        executor = ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=init_seed_worker,
+            initargs=(current_app._get_current_object(), hashes),
+        )
+        results = executor.map(seed_batch, *zip(*batches))
+    else:
+        results = (seed_batch(*batch, hashes) for batch in batches)
+
+    try:
+        for rows in results:
+            inserted += rows
+            echo(f"Inserted {inserted} of {count} users.")
+    except Exception as error:
+        db.session.rollback()
+        echo(f"Seeding failed after {inserted} users: {error}", err=True)
+        sys.exit(1)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    elapsed = time.monotonic() - started
+    echo(
+        f"Seeded {inserted} users, "
+        f"{inserted / elapsed if elapsed else inserted:.0f} rows/s.",
+    )
+    sys.exit(0)
@@ -3,3 +3,7 @@ USER_NOT_FOUND = "User not found."
 USER_ALREADY_EXIST = "User already exist."
 DELETE_YOURSELF_VALIDATION = "Can't delete yourself."
 USER_WAS_DELETED = "User was deleted."
+USER_WAS_UPDATED = "User was updated."
+BULK_TARGET_VALIDATION = "Exactly one of ids or not empty filter is required."
+INVALID_LOGIN = "Invalid login."
+INVALID_PASSWORD = "Invalid password."
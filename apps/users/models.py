@@ -1,9 +1,10 @@
 import datetime
 
-from sqlalchemy import Column, String, Boolean
+from sqlalchemy import Column, String, Boolean, Index
 from werkzeug.security import generate_password_hash, check_password_hash
 
 from apps import db
+from apps.core.executors import run_hashing
 from apps.core.models import DateTimeModel
 
 
@@ -11,6 +12,15 @@ class User(DateTimeModel):
     """ Model for app users. """
 
     __tablename__ = "users"
+    __table_args__ = (
+        # list ordering and keyset pagination
+        Index("ix_users_created_at_id", "created_at", "id"),
+        # list filters with default ordering
+        Index("ix_users_is_active_created_at_id",
+              "is_active", "created_at", "id"),
+        Index("ix_users_is_admin_created_at_id",
+              "is_admin", "created_at", "id"),
+    )
 
     login = Column(String(length=50), nullable=False, unique=True)
     password = Column(String(length=200), nullable=False)
@@ -30,7 +40,7 @@ class User(DateTimeModel):
         :param str password: user password value
         """
 
-        self.password = generate_password_hash(password)
+        self.password = run_hashing(generate_password_hash, password)
 
     def check_password(self, password):
         """
@@ -39,7 +49,29 @@ class User(DateTimeModel):
         :rtype: bool
         """
 
-        return check_password_hash(self.password, password)
+        return self.verify_password(self.password, password)
+
+    @staticmethod
+    def verify_password(password_hash, password):
+        """
+        Check password against hash and return boolean value.
+        :param str password_hash: stored password hash
+        :param str password: user password value
+        :rtype: bool
+        """
+
+        return run_hashing(check_password_hash, password_hash, password)
+
+    @classmethod
+    def get_credentials(cls, login):
+        """
+        Load only id and password hash of user by login.
+        :param str login: user login
+        :return: row with id and password or None
+        """
+
+        return db.session.query(cls.id, cls.password)\
+            .filter_by(login=login).first()
 
     def update(self, data):
         data["updated_at"] = datetime.datetime.utcnow()
@@ -49,6 +81,7 @@ class User(DateTimeModel):
             else:
                 setattr(self, key, value)
         db.session.commit()
+        self.invalidate_cached(self.id)
 
     def __str__(self):
         return self.login
@@ -5,8 +5,11 @@ from marshmallow.fields import Int, Str, Email, DateTime, Boolean
 from sqlalchemy import or_
 
 from apps import db
-from apps.core.schemes import BaseModelSchema
-from apps.users.constants import USER_ALREADY_EXIST
+from apps.core.schemes import BaseModelSchema, SchemaExtraValidator
+from apps.users.constants import (
+    USER_ALREADY_EXIST, INVALID_LOGIN, INVALID_PASSWORD,
+    BULK_TARGET_VALIDATION,
+)
 from apps.users.models import User
 
 
@@ -50,6 +53,19 @@ class UserRegistrationSchema(UserSchema):
             raise ValidationError(USER_ALREADY_EXIST)
 
 
+class UserImportSchema(UserRegistrationSchema):
+    """
+    Schema for users import. Loads plain dicts instead of instances,
+    uniqueness is checked by import command for whole chunk at once.
+    """
+
+    def make_instance(self, data):
+        return data
+
+    def validates_schema(self, data):
+        pass
+
+
 class UserUpdateSchema(UserRegistrationSchema):
     """ Serializer for user update. """
 
@@ -57,6 +73,43 @@ class UserUpdateSchema(UserRegistrationSchema):
     password = Str()
 
 
+class UsersFilterSchema(SchemaExtraValidator, Schema):
+    """ Schema for users bulk operations filter. """
+
+    is_active = Boolean()
+    is_admin = Boolean()
+
+
+class UsersBulkChangesSchema(SchemaExtraValidator, Schema):
+    """ Schema for fields allowed in users bulk update. """
+
+    name = Str(validate=[validate.Length(min=2)])
+    is_active = Boolean()
+    is_admin = Boolean()
+
+
+class UsersBulkDeleteSchema(SchemaExtraValidator, Schema):
+    """ Schema for users bulk delete, targeted by ids or filter. """
+
+    ids = fields.List(Int())
+    filter = fields.Nested(UsersFilterSchema)
+
+    @validates_schema
+    def validates_schema(self, data):
+        if bool(data.get("ids")) == bool(data.get("filter")):
+            raise ValidationError(BULK_TARGET_VALIDATION)
+
+
+class UsersBulkUpdateSchema(UsersBulkDeleteSchema):
+    """ Schema for users bulk update. """
+
+    data = fields.Nested(
+        UsersBulkChangesSchema,
+        required=True,
+        validate=[validate.Length(min=1)],
+    )
+
+
 class AuthTokenSchema(Schema):
     """ Authorization token schema. """
 
@@ -64,18 +117,28 @@ class AuthTokenSchema(Schema):
 
 
 class UserLoginSchema(Schema):
-    """ Schema for user login. """
+    """
+    Schema for user login. Validated user id is stored to schema
+    context, so schema instance must not be shared between requests.
+    """
 
     login = fields.Str(required=True)
     password = fields.Str(required=True)
 
     @validates_schema
     def validates_schema(self, data):
-        if data.get("login"):
-            user = User.query.filter_by(login=data.get("login")).first()
+        # empty login passes required check, so it's checked here too
+        if "login" in data:
+            credentials = User.get_credentials(data.get("login"))
+
+            if not credentials:
+                raise ValidationError(INVALID_LOGIN)
+
+            if data.get("password") is None:
+                return
 
-            if not user:
-                raise ValidationError("Invalid login.")
+            if not User.verify_password(
+                    credentials.password, data.get("password")):
+                raise ValidationError(INVALID_PASSWORD)
 
-            if not user.check_password(data.get("password")):
-                raise ValidationError("Invalid password.")
+            self.context["user_id"] = credentials.id
@@ -0,0 +1,297 @@
+"""
+API endpoints latency and allocations benchmark with regression gate.
+Every endpoint is called by Flask test client against seeded
+users table of several sizes. Model and response caches are disabled,
+so queries, pagination and serialization are measured on every request.
+Latency depends on hardware and Python version, so check must be run
+against baseline recorded on the same machine.
+Usage:
+    python -m benchmarks.endpoints run --output benchmarks/baseline.json
+    python -m benchmarks.endpoints check --baseline benchmarks/baseline.json
+"""
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from werkzeug.security import generate_password_hash
+
+from apps import create_app, db
+from apps.config import TestConfig
+from apps.core.bulk import bulk_insert
+from apps.core.constants import APPLICATION_JSON, AUTHORIZATION_HEADER
+from apps.core.models import BaseModel
+from apps.users.models import User
+
+SIZES = (100, 1000, 10000)
+REPEAT = 50
+# requests traced by tracemalloc, it slows requests down,
+# so allocations are measured separately from latency
+ALLOC_REPEAT = 5
+TOLERANCE = 0.25
+GATED_METRICS = ("p50_ms", "p95_ms", "alloc_kib")
+PASSWORD = "password"
+API = "/api/v1/users"
+
+
+def seed(size):
+    """
+    Recreate users table with size users, user 1 is admin.
+    Password hash is computed once and shared by all users.
+    :param int size: users count
+    """
+
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+    BaseModel.clear_caches()
+
+    password = generate_password_hash(PASSWORD)
+    now = datetime.datetime.utcnow()
+    bulk_insert(User.__table__, [
+        {
+            "login": f"user_{index}",
+            "password": password,
+            "name": f"Test User {index}",
+            "email": f"user_{index}@powercode.us",
+            "is_active": True,
+            "is_admin": index == 1,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for index in range(1, size + 1)
+    ])
+    db.session.commit()
+
+
+def get_scenarios(client, size):
+    """
+    Endpoint requests, each scenario is called with iteration number.
+    :param client: Flask test client
+    :param int size: seeded users count
+    :return: scenario name to function map
+    :rtype: dict
+    """
+
+    def post(url, payload, headers=None):
+        return client.post(
+            url,
+            data=json.dumps(payload),
+            content_type=APPLICATION_JSON,
+            headers=headers,
+        )
+
+    token = json.loads(post(
+        f"{API}/login/", {"login": "user_1", "password": PASSWORD},
+    ).data)["access_token"]
+    headers = {AUTHORIZATION_HEADER: f"{TestConfig.JWT_HEADER_TYPE} {token}"}
+
+    return {
+        "login": lambda index: post(
+            f"{API}/login/", {"login": "user_2", "password": PASSWORD},
+        ),
+        "registration": lambda index: post(f"{API}/registration/", {
+            "login": f"new_user_{index}",
+            "password": PASSWORD,
+            "name": f"New User {index}",
+            "email": f"new_user_{index}@powercode.us",
+            "is_active": True,
+        }),
+        "profile": lambda index: client.get(
+            f"{API}/profile/", headers=headers,
+        ),
+        "list": lambda index: client.get(f"{API}/", headers=headers),
+        "detail": lambda index: client.get(
+            f"{API}/{index % size + 1}", headers=headers,
+        ),
+        "patch": lambda index: client.patch(
+            f"{API}/{index % size + 1}",
+            data=json.dumps({"name": f"Patched User {index}"}),
+            content_type=APPLICATION_JSON,
+            headers=headers,
+        ),
+        # users from the end of table, admin user 1 is kept
+        "delete": lambda index: client.delete(
+            f"{API}/{size - index}", headers=headers,
+        ),
+    }
+
+
+def percentile(values, percent):
+    """
+    Nearest rank percentile.
+    :param list values: sorted values
+    :param int percent: percentile
+    """
+
+    return values[max(0, -(-len(values) * percent // 100) - 1)]
+
+
+def measure(scenario, repeat, offset):
+    """
+    Latency percentiles and median peak allocations of scenario.
+    :param scenario: scenario function
+    :param int repeat: measured requests count
+    :param int offset: first iteration number
+    :rtype: dict
+    """
+
+    latencies = []
+
+    for index in range(offset, offset + repeat):
+        started = time.perf_counter()
+        response = scenario(index)
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert response.status_code < 400, (
+            response.status_code, response.data,
+        )
+
+    peaks = []
+
+    for index in range(offset + repeat, offset + repeat + ALLOC_REPEAT):
+        tracemalloc.start()
+        scenario(index)
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+
+    latencies.sort()
+    peaks.sort()
+    return {
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "alloc_kib": round(percentile(peaks, 50), 1),
+    }
+
+
+def run(sizes, repeat, database_uri=None):
+    """
+    Benchmark all scenarios for every table size.
+    :return: results by `scenario@size` key
+    :rtype: dict
+    """
+
+    config = type("BenchmarkConfig", (TestConfig,), {
+        "SQLALCHEMY_DATABASE_URI": database_uri
+        or TestConfig.SQLALCHEMY_DATABASE_URI,
+        # repeated requests would be cache hits without SQL
+        "MODEL_CACHE_SIZE": 0,
+        "RESPONSE_CACHE_SIZE": 0,
+    })
+    app = create_app(config)
+    results = {}
+
+    with app.app_context():
+        for size in sizes:
+            if size <= repeat + ALLOC_REPEAT:
+                sys.exit(f"Table size {size} must be larger than repeat.")
+
+            seed(size)
+            client = app.test_client()
+
+            # warm up
+            for name, scenario in get_scenarios(client, size).items():
+                if name not in ("registration", "delete"):
+                    scenario(0)
+
+            for name, scenario in get_scenarios(client, size).items():
+                result = measure(scenario, repeat, 1)
+                results[f"{name}@{size}"] = result
+                print(f"{name + '@' + str(size):<20} "
+                      f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                      f"{result['p99_ms']:>9.2f} {result['alloc_kib']:>11.1f}")
+
+        db.session.remove()
+        db.drop_all()
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "database": app.config["SQLALCHEMY_DATABASE_URI"].split(":")[0],
+            "repeat": repeat,
+            "created_at": datetime.datetime.utcnow().isoformat(),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, tolerance, metrics=GATED_METRICS):
+    """
+    Find metrics which regressed more than tolerance.
+    :param dict baseline: baseline results
+    :param dict current: current results
+    :param float tolerance: allowed relative growth
+    :param metrics: compared metrics
+    :return: regressions descriptions
+    :rtype: list
+    """
+
+    regressions = []
+
+    for key, values in current.items():
+        if key not in baseline:
+            continue
+
+        for metric in metrics:
+            before, after = baseline[key][metric], values[metric]
+
+            if after > before * (1 + tolerance):
+                regressions.append(
+                    f"{key} {metric}: {before} -> {after} "
+                    f"({(after / before - 1) * 100 if before else 100:+.0f}%)",
+                )
+
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("action", choices=("run", "check"))
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)),
+                        help="Comma separated users table sizes.")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--database-uri",
+                        help="Database, SQLite test database by default.")
+    parser.add_argument("--output", help="Write results to JSON file.")
+    parser.add_argument("--baseline", default="benchmarks/baseline.json")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="Allowed relative regression, 0.25 is 25%%.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if args.action == "check":
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    print(f"{'endpoint':<20} {'p50, ms':>9} {'p95, ms':>9} {'p99, ms':>9} "
+          f"{'alloc, KiB':>11}")
+    report = run(
+        [int(size) for size in args.sizes.split(",")],
+        args.repeat,
+        args.database_uri,
+    )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+
+    if args.action == "check":
+        regressions = compare(
+            baseline["results"], report["results"], args.tolerance,
+        )
+
+        if regressions:
+            print("\nRegressions:\n" + "\n".join(regressions))
+            sys.exit(1)
+
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
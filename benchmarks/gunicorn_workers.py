@@ -0,0 +1,152 @@
+"""
+Requests per second of login and profile endpoints served by
+gunicorn with gunicorn_conf.py for 1..N workers.
+Usage: python -m benchmarks.gunicorn_workers [--max-workers N]
+"""
+from gevent import monkey
+
+monkey.patch_all()
+
+import argparse  # noqa: E402
+import http.client  # noqa: E402
+import os  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+
+import gevent  # noqa: E402
+from flask import json  # noqa: E402
+
+from apps import create_app, db  # noqa: E402
+from apps.config import TestConfig, PROJECT_DIR  # noqa: E402
+from apps.core.constants import (  # noqa: E402
+    APPLICATION_JSON, AUTHORIZATION_HEADER,
+)
+from tests.fixtures import add_test_users, get_users  # noqa: E402
+
+HOST = "127.0.0.1"
+PORT = 8765
+CONCURRENCY = 20
+DURATION = 5
+
+
+def request(connection, method, url, body=None, headers=None):
+    # TestConfig SERVER_NAME has no port
+    headers = dict(headers or {}, Host=TestConfig.SERVER_NAME)
+    connection.request(method, url, body=body, headers=headers)
+    response = connection.getresponse()
+    data = response.read()
+    assert response.status == 200, (response.status, data)
+    return data
+
+
+def login_body():
+    user = get_users()[0]
+    return json.dumps(
+        {"login": user["login"], "password": user["password"]},
+    )
+
+
+def measure(method, url, body=None, headers=None):
+    """
+    Send requests by keep-alive connections for DURATION seconds.
+    :return: requests per second
+    :rtype: float
+    """
+
+    deadline = time.monotonic() + DURATION
+    counts = []
+
+    def worker():
+        connection = http.client.HTTPConnection(HOST, PORT)
+        count = 0
+        while time.monotonic() < deadline:
+            request(connection, method, url, body, headers)
+            count += 1
+        connection.close()
+        counts.append(count)
+
+    gevent.joinall(
+        [gevent.spawn(worker) for _ in range(CONCURRENCY)],
+        raise_error=True,
+    )
+    return sum(counts) / DURATION
+
+
+def wait_server(process):
+    for _ in range(100):
+        if process.poll() is not None:
+            sys.exit("gunicorn failed to start")
+        try:
+            http.client.HTTPConnection(HOST, PORT).connect()
+            return
+        except ConnectionRefusedError:
+            time.sleep(0.1)
+    sys.exit("gunicorn didn't start in time")
+
+
+def run(workers):
+    env = dict(
+        os.environ,
+        ENV="testing",
+        GUNICORN_BIND=f"{HOST}:{PORT}",
+        GUNICORN_WORKERS=str(workers),
+        GUNICORN_ACCESS_LOG="/dev/null",
+        GUNICORN_ERROR_LOG="-",
+    )
+    process = subprocess.Popen(
+        [os.path.join(os.path.dirname(sys.executable), "gunicorn"),
+         "-c", "gunicorn_conf.py", "wsgi:app"],
+        cwd=PROJECT_DIR,
+        env=env,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        wait_server(process)
+        connection = http.client.HTTPConnection(HOST, PORT)
+        headers = {"Content-Type": APPLICATION_JSON}
+        token = json.loads(request(
+            connection, "POST", "/api/v1/users/login/", login_body(),
+            headers,
+        ))["access_token"]
+        connection.close()
+
+        login = measure("POST", "/api/v1/users/login/", login_body(),
+                        headers)
+        profile = measure("GET", "/api/v1/users/profile/", headers={
+            AUTHORIZATION_HEADER: f"{TestConfig.JWT_HEADER_TYPE} {token}",
+        })
+    finally:
+        process.terminate()
+        process.wait()
+
+    return login, profile
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-workers", type=int,
+                        default=max(2, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    os.makedirs(os.path.join(PROJECT_DIR, "tmp"), exist_ok=True)
+    app = create_app(TestConfig)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        add_test_users()
+
+    print(f"{'workers':>8} {'login, req/s':>13} {'profile, req/s':>15}")
+
+    for workers in range(1, args.max_workers + 1):
+        login, profile = run(workers)
+        print(f"{workers:>8} {login:>13.1f} {profile:>15.1f}")
+
+    with app.app_context():
+        db.drop_all()
+
+
+if __name__ == "__main__":
+    main()
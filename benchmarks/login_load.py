@@ -0,0 +1,100 @@
+"""
+Profile endpoint latency while logins run concurrently under gevent.
+Compares hashing on the hub (HASH_POOL_SIZE=0) with hashing
+in native threads pool.
+Usage: python -m benchmarks.login_load
+"""
+from gevent import monkey
+
+monkey.patch_all()
+
+import statistics  # noqa: E402
+import time  # noqa: E402
+
+import gevent  # noqa: E402
+from flask import json  # noqa: E402
+
+from apps import create_app, db  # noqa: E402
+from apps.config import TestConfig  # noqa: E402
+from apps.core.constants import (  # noqa: E402
+    APPLICATION_JSON, AUTHORIZATION_HEADER,
+)
+from tests.fixtures import add_test_users, get_users  # noqa: E402
+
+LOGIN_WORKERS = 4
+PROFILE_INTERVAL = 0.01
+DURATION = 3
+
+
+def login(client, user):
+    response = client.post(
+        "/api/v1/users/login/",
+        data=json.dumps(
+            {"login": user["login"], "password": user["password"]},
+        ),
+        content_type=APPLICATION_JSON,
+    )
+    return json.loads(response.data)["access_token"]
+
+
+def run(app, pool_size):
+    """
+    Poll profile endpoint while login greenlets keep hashing.
+    Latency is counted from scheduled time, so hub stalls are included.
+    :return: profile latencies in milliseconds
+    :rtype: list
+    """
+
+    app.config["HASH_POOL_SIZE"] = pool_size
+    client = app.test_client()
+    user = get_users()[0]
+    headers = {
+        AUTHORIZATION_HEADER: f"{app.config['JWT_HEADER_TYPE']} "
+                              f"{login(client, user)}",
+    }
+    deadline = time.monotonic() + DURATION
+    latencies = []
+
+    def login_loop():
+        while time.monotonic() < deadline:
+            login(client, user)
+            gevent.sleep(0)
+
+    def profile_loop():
+        scheduled = time.monotonic()
+        while scheduled < deadline:
+            client.get("/api/v1/users/profile/", headers=headers)
+            latencies.append((time.monotonic() - scheduled) * 1000)
+            scheduled += PROFILE_INTERVAL
+            gevent.sleep(max(0, scheduled - time.monotonic()))
+
+    gevent.joinall(
+        [gevent.spawn(login_loop) for _ in range(LOGIN_WORKERS)]
+        + [gevent.spawn(profile_loop)],
+    )
+    return latencies
+
+
+def main():
+    app = create_app(TestConfig)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        add_test_users()
+
+        print(f"{'hash pool':>10} {'requests':>9} {'p50, ms':>8} "
+              f"{'p95, ms':>8} {'max, ms':>8}")
+
+        for pool_size in (0, app.config["HASH_POOL_SIZE"] or 1):
+            latencies = sorted(run(app, pool_size))
+            p95 = latencies[int(len(latencies) * 0.95) - 1]
+            print(f"{pool_size:>10} {len(latencies):>9} "
+                  f"{statistics.median(latencies):>8.1f} {p95:>8.1f} "
+                  f"{latencies[-1]:>8.1f}")
+
+        db.drop_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+MessagePack vs JSON users list encoding microbenchmark.
+Compares payload size and encode/decode time of serialized users.
+Usage: python -m benchmarks.msgpack_vs_json
+"""
+import json
+import timeit
+
+import msgpack
+
+from apps import create_app
+from apps.config import TestConfig
+from apps.core.schemes import get_schema
+from apps.users.schemes import UserSchema
+from benchmarks.serialization import make_users, SIZES, REPEAT
+
+
+def measure(func, payload, size):
+    """
+    Best per item time in microseconds.
+    :rtype: float
+    """
+
+    number = max(1, 1000 // size)
+    best = min(timeit.repeat(
+        lambda: func(payload), number=number, repeat=REPEAT,
+    ))
+    return best / number / size * 1e6
+
+
+def main():
+    with create_app(TestConfig).app_context():
+        print(
+            f"{'items':>6} {'json, B':>9} {'msgpack, B':>11} "
+            f"{'json enc/dec, us':>17} {'msgpack enc/dec, us':>20}",
+        )
+
+        for size in SIZES:
+            data = get_schema(UserSchema, many=True)\
+                .dump(make_users(size)).data
+            json_body = json.dumps(data).encode()
+            msgpack_body = msgpack.packb(data, use_bin_type=True)
+
+            json_time = (
+                measure(json.dumps, data, size),
+                measure(json.loads, json_body, size),
+            )
+            msgpack_time = (
+                measure(lambda item: msgpack.packb(item, use_bin_type=True),
+                        data, size),
+                measure(lambda item: msgpack.unpackb(item, raw=False),
+                        msgpack_body, size),
+            )
+            print(
+                f"{size:>6} {len(json_body):>9} {len(msgpack_body):>11} "
+                f"{json_time[0]:>8.2f}/{json_time[1]:<8.2f} "
+                f"{msgpack_time[0]:>11.2f}/{msgpack_time[1]:<8.2f}",
+            )
+
+
+if __name__ == "__main__":
+    main()
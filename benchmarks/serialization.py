@@ -0,0 +1,76 @@
+"""
+UserSchema serialization microbenchmark.
+Compares schema instance per item (old make_response behaviour)
+with cached schema instance and single many=True dump.
+Usage: python -m benchmarks.serialization
+"""
+import datetime
+import timeit
+
+from apps import create_app
+from apps.config import TestConfig
+from apps.core.schemes import get_schema
+from apps.users.models import User
+from apps.users.schemes import UserSchema
+
+SIZES = (10, 100, 1000)
+REPEAT = 5
+
+
+def make_users(count):
+    """
+    Build transient users without password hashing.
+    :param int count: users count
+    :rtype: list
+    """
+
+    now = datetime.datetime.utcnow()
+    return [
+        User(
+            id=index,
+            login=f"user_{index}",
+            name=f"Test User {index}",
+            email=f"user_{index}@powercode.us",
+            created_at=now,
+            updated_at=now,
+            is_active=True,
+            is_admin=False,
+        )
+        for index in range(count)
+    ]
+
+
+def dump_per_item(users):
+    return [UserSchema().dump(user).data for user in users]
+
+
+def dump_many(users):
+    return get_schema(UserSchema, many=True).dump(users).data
+
+
+def measure(func, users):
+    """
+    Best per item time in microseconds.
+    :rtype: float
+    """
+
+    number = max(1, 1000 // len(users))
+    best = min(timeit.repeat(
+        lambda: func(users), number=number, repeat=REPEAT,
+    ))
+    return best / number / len(users) * 1e6
+
+
+def main():
+    with create_app(TestConfig).app_context():
+        print(f"{'items':>6} {'per item, us':>14} {'many=True, us':>14}")
+
+        for size in SIZES:
+            users = make_users(size)
+            before = measure(dump_per_item, users)
+            after = measure(dump_many, users)
+            print(f"{size:>6} {before:>14.1f} {after:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
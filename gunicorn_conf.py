@@ -1,16 +1,77 @@
+import multiprocessing
 import os
 
+from dotenv import load_dotenv
 
 TMP = os.path.expanduser("./tmp/")
+CPU_COUNT = multiprocessing.cpu_count()
 
-bind = "unix:/var/tmp/gunicorn.sock"
-workers = 1
-worker_class = "gevent"
-max_requests = 1000
+# prometheus_client reads prometheus_multiproc_dir once at import,
+# so .env is loaded before it's imported here or by preloaded app
+load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"))
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent")
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+# app is preloaded in master, so it must be patched before app import
+if worker_class == "gevent" and preload_app:
+    from gevent import monkey
+    monkey.patch_all()
+
+from prometheus_client import multiprocess  # noqa: E402
+
+bind = os.getenv("GUNICORN_BIND", "unix:/var/tmp/gunicorn.sock")
+# async workers serve many requests each, one worker per core is enough,
+# sync workers wait on IO, so there are more of them
+workers = int(
+    os.getenv("GUNICORN_WORKERS")
+    or (CPU_COUNT if worker_class == "gevent" else CPU_COUNT * 2 + 1),
+)
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 1000))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 1000))
+# workers restart at different requests count, not all at once
+max_requests_jitter = int(
+    os.getenv("GUNICORN_MAX_REQUESTS_JITTER", max_requests // 10),
+)
 daemon = False
 pidfile = TMP + "api_gunicorn.pid"
-accesslog = "logs/api_gunicorn.access.log"
-errorlog = "logs/api_gunicorn.error.log"
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "logs/api_gunicorn.access.log")
+errorlog = os.getenv("GUNICORN_ERROR_LOG", "logs/api_gunicorn.error.log")
 graceful_timeout = 60
 timeout = 300
-keepalive = 0
+# longer than proxy upstream idle timeout, so proxy closes connections
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 75))
+
+
+def on_starting(server):
+    """ Remove metrics files left by previous run. """
+
+    metrics_dir = os.getenv("prometheus_multiproc_dir")
+
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+        for name in os.listdir(metrics_dir):
+            os.remove(os.path.join(metrics_dir, name))
+
+
+def post_worker_init(worker):
+    """
+    Drop DB connections and log writers inherited from preloaded master.
+    """
+
+    from apps import db
+    from apps.logs import start_listeners
+
+    app = worker.wsgi
+
+    with app.app_context():
+        db.engine.dispose()
+
+    start_listeners(app)
+
+
+def child_exit(server, worker):
+    """ Drop exited worker live gauges from metrics. """
+
+    if "prometheus_multiproc_dir" in os.environ:
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,28 @@
+"""users list indexes
+
+Revision ID: 7c1e4b9a2f35
+Revises: d328de060b15
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e4b9a2f35'
+down_revision = 'd328de060b15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    op.create_index('ix_users_is_active_created_at_id', 'users', ['is_active', 'created_at', 'id'], unique=False)
+    op.create_index('ix_users_is_admin_created_at_id', 'users', ['is_admin', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_users_is_admin_created_at_id', table_name='users')
+    op.drop_index('ix_users_is_active_created_at_id', table_name='users')
+    op.drop_index('ix_users_created_at_id', table_name='users')
@@ -1,12 +1,25 @@
+import datetime
+
+import msgpack
 from flask import url_for, json
+from sqlalchemy import event
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import http_date
 
+from apps.api.v1.users import UsersListResource
+from apps.core.cache import clear_response_cache
 from apps.core.constants import (
     EMPTY_PAYLOAD, METHOD_NOT_ALLOWED, APPLICATION_X, WRONG_REQUEST_DATA_TYPE,
-    MISSING_AUTH_HEADER, MISSING_DATA_FOR_REQUIRED,
+    MISSING_AUTH_HEADER, MISSING_DATA_FOR_REQUIRED, INVALID_CURSOR,
+    APPLICATION_JSON, APPLICATION_NDJSON, INVALID_VALUE,
+    NOT_ALLOWED_SORT_FIELD, INVALID_FIELD, APPLICATION_MSGPACK,
+    MALFORMED_REQUEST_DATA,
 )
+from apps.core.filters import apply_filters, get_ordering
+from apps.core.pagination import keyset_filter, encode_cursor
 from apps.users.constants import (
-    USERS_NOT_FOUND, USER_NOT_FOUND, USER_WAS_DELETED,
-    USER_ALREADY_EXIST, DELETE_YOURSELF_VALIDATION,
+    USERS_NOT_FOUND, USER_NOT_FOUND, USER_WAS_DELETED, USER_WAS_UPDATED,
+    USER_ALREADY_EXIST, DELETE_YOURSELF_VALIDATION, INVALID_LOGIN,
 )
 from apps.users.models import User
 from tests.fixtures import add_test_users, get_users
@@ -41,6 +54,60 @@ class UserLoginTestCase(ApiTestCase):
         self.assertEqual(200, response.status_code)
         self.assertIsNotNone(response_data.get("access_token"))
 
+    def test_statements_count(self):
+        """ Test case for login done by single SQL statement. """
+
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        payload = {
+            "login": get_users()[1].get("login"),
+            "password": get_users()[1].get("password"),
+        }
+        event.listen(self.db.engine, "before_cursor_execute", count)
+        try:
+            response, response_data = self.get_response(
+                method="POST",
+                payload=payload,
+            )
+        finally:
+            event.remove(self.db.engine, "before_cursor_execute", count)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, len(statements), statements)
+
+    def test_msgpack_request(self):
+        """ Test case for request and response in MessagePack. """
+
+        payload = {
+            "login": get_users()[0].get("login"),
+            "password": get_users()[0].get("password"),
+        }
+        response = self.client.post(
+            self.url,
+            data=msgpack.packb(payload, use_bin_type=True),
+            content_type=APPLICATION_MSGPACK,
+            headers={"Accept": APPLICATION_MSGPACK},
+        )
+        response_data = msgpack.unpackb(response.data, raw=False)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(APPLICATION_MSGPACK, response.mimetype)
+        self.assertIsNotNone(response_data.get("access_token"))
+
+        response = self.client.post(
+            self.url,
+            data=b"\xc1",
+            content_type=APPLICATION_MSGPACK,
+        )
+        self.assertEqual(400, response.status_code)
+        self.assertDictEqual(
+            {"message": MALFORMED_REQUEST_DATA},
+            json.loads(response.data),
+        )
+
     def test_invalid_method(self):
         """ Test case for request with invalid method. """
 
@@ -102,6 +169,19 @@ class UserLoginTestCase(ApiTestCase):
         self.assertEqual(400, response.status_code)
         self.assertDictEqual(expected, response_data)
 
+    def test_empty_login(self):
+        """ Test case for request with empty login. """
+
+        expected = {"message": {"_schema": [INVALID_LOGIN]}}
+
+        response, response_data = self.get_response(
+            method="POST",
+            payload={"login": "", "password": "test"},
+        )
+
+        self.assertEqual(400, response.status_code)
+        self.assertDictEqual(expected, response_data)
+
     def test_wrong_param_type(self):
         """ Test case for request with wrong param type. """
 
@@ -434,6 +514,591 @@ class UsersListResourceTestCase(ApiTestCase):
         User.query.delete()
         self.db.session.commit()
 
+    def test_total_count(self):
+        # add dummy data
+        add_test_users()
+
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        user_token = self.login_as_user("user_1")
+        # load current user to session
+        self.get_response(
+            url=url_for("api_v1.current_user_profile"),
+            method="GET",
+            token=user_token,
+        )
+
+        event.listen(self.db.engine, "before_cursor_execute", count)
+        try:
+            response, response_data = self.get_response(
+                url=url_for("api_v1.users_list", page=2, limit=2),
+                method="GET",
+                token=user_token,
+            )
+        finally:
+            event.remove(self.db.engine, "before_cursor_execute", count)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([3], [item["id"] for item in response_data])
+        self.assertEqual("3", response.headers.get("X-Total-Count"))
+        self.assertEqual(1, len(statements), statements)
+
+        # estimated count is exact on SQLite
+        response, response_data = self.get_response(
+            url=url_for("api_v1.users_list", page=1, count="estimated"),
+            method="GET",
+            token=user_token,
+        )
+        self.assertEqual("3", response.headers.get("X-Total-Count"))
+        self.assertIsNone(response.headers.get("X-Total-Count-Estimated"))
+
+        response, response_data = self.get_response(
+            url=url_for("api_v1.users_list", page=1, count="none"),
+            method="GET",
+            token=user_token,
+        )
+        self.assertEqual(3, len(response_data))
+        self.assertIsNone(response.headers.get("X-Total-Count"))
+
+        # clear db
+        User.query.delete()
+        self.db.session.commit()
+
+    def test_cursor_pagination(self):
+        # add dummy data
+        add_test_users()
+
+        user_token = self.login_as_user("user_1")
+
+        response, response_data = self.get_response(
+            url=url_for("api_v1.users_list", limit=2),
+            method="GET",
+            token=user_token,
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([1, 2], [item["id"] for item in response_data])
+        cursor = response.headers.get("X-Next-Cursor")
+        self.assertTrue(cursor)
+        self.assertIn(f"after={cursor}", response.headers.get("Link"))
+
+        response, response_data = self.get_response(
+            url=url_for("api_v1.users_list", limit=2, after=cursor),
+            method="GET",
+            token=user_token,
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([3], [item["id"] for item in response_data])
+        self.assertIsNone(response.headers.get("X-Next-Cursor"))
+        self.assertIsNone(response.headers.get("Link"))
+
+        response, response_data = self.get_response(
+            url=url_for("api_v1.users_list", after="wrong"),
+            method="GET",
+            token=user_token,
+        )
+
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(INVALID_CURSOR, response_data.get("message"))
+
+        # values must have types of ordering columns
+        for values in (
+            ["2000-01-01T00:00:00.000000", "2"],
+            ["2000-01-01T00:00:00.000000", 2.5],
+            ["2000-01-01T00:00:00.000000", True],
+            [1, 2],
+        ):
+            response, response_data = self.get_response(
+                url=url_for("api_v1.users_list", after=encode_cursor(values)),
+                method="GET",
+                token=user_token,
+            )
+
+            self.assertEqual(400, response.status_code, values)
+            self.assertEqual(INVALID_CURSOR, response_data.get("message"))
+
+        # page size is limited by config
+        max_limit = self.app.config["API_PAGE_LIMIT_MAX"]
+        self.app.config["API_PAGE_LIMIT_MAX"] = 1
+        response, response_data = self.get_response(
+            url=url_for("api_v1.users_list", limit=100),
+            method="GET",
+            token=user_token,
+        )
+        self.app.config["API_PAGE_LIMIT_MAX"] = max_limit
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, len(response_data))
+
+        # clear db
+        User.query.delete()
+        self.db.session.commit()
+
+    def test_filters_and_sort(self):
+        # add dummy data
+        add_test_users()
+
+        user_token = self.login_as_user("user_1")
+
+        response, response_data = self.get_response(
+            url=url_for(
+                "api_v1.users_list",
+                is_active="true",
+                is_admin="false",
+                sort="-login",
+            ),
+            method="GET",
+            token=user_token,
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            ["user_3", "user_2"],
+            [item["login"] for item in response_data],
+        )
+
+        # descending keyset pagination
+        response, response_data = self.get_response(
+            url=url_for("api_v1.users_list", sort="-id", limit=2),
+            method="GET",
+            token=user_token,
+        )
+        self.assertEqual([3, 2], [item["id"] for item in response_data])
+
+        response, response_data = self.get_response(
+            url=url_for(
+                "api_v1.users_list",
+                sort="-id",
+                limit=2,
+                after=response.headers.get("X-Next-Cursor"),
+            ),
+            method="GET",
+            token=user_token,
+        )
+        self.assertEqual([1], [item["id"] for item in response_data])
+
+        response, response_data = self.get_response(
+            url=url_for("api_v1.users_list", created_after="2000-01-01"),
+            method="GET",
+            token=user_token,
+        )
+        self.assertEqual(3, len(response_data))
+
+        # invalid args
+        response, response_data = self.get_response(
+            url=url_for(
+                "api_v1.users_list",
+                is_active="maybe",
+                created_before="yesterday",
+            ),
+            method="GET",
+            token=user_token,
+        )
+        expected = {
+            "message": {
+                "is_active": [INVALID_VALUE],
+                "created_before": [INVALID_VALUE],
+            },
+        }
+        self.assertEqual(400, response.status_code)
+        self.assertDictEqual(expected, response_data)
+
+        response, response_data = self.get_response(
+            url=url_for("api_v1.users_list", sort="password"),
+            method="GET",
+            token=user_token,
+        )
+        expected = {"message": {"sort": [NOT_ALLOWED_SORT_FIELD]}}
+        self.assertEqual(400, response.status_code)
+        self.assertDictEqual(expected, response_data)
+
+        # clear db
+        User.query.delete()
+        self.db.session.commit()
+
+    def test_sparse_fieldset(self):
+        # add dummy data
+        add_test_users()
+
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        user_token = self.login_as_user("user_1")
+
+        event.listen(self.db.engine, "before_cursor_execute", count)
+        try:
+            response, response_data = self.get_response(
+                url=url_for("api_v1.users_list", fields="login, id"),
+                method="GET",
+                token=user_token,
+            )
+        finally:
+            event.remove(self.db.engine, "before_cursor_execute", count)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            [
+                {"id": 1, "login": "user_1"},
+                {"id": 2, "login": "user_2"},
+                {"id": 3, "login": "user_3"},
+            ],
+            response_data,
+        )
+        self.assertFalse(
+            [item for item in statements if "users.password" in item
+             and "LIMIT" in item],
+            statements,
+        )
+
+        response, response_data = self.get_response(
+            url=url_for("api_v1.user_details", resource_id=2, fields="name"),
+            method="GET",
+            token=user_token,
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertDictEqual({"name": "Test User 2"}, response_data)
+
+        response, response_data = self.get_response(
+            url=url_for("api_v1.users_list", fields="id,password,foo"),
+            method="GET",
+            token=user_token,
+        )
+        expected = {
+            "message": {
+                "fields": [
+                    INVALID_FIELD.format(field="foo"),
+                    INVALID_FIELD.format(field="password"),
+                ],
+            },
+        }
+        self.assertEqual(400, response.status_code)
+        self.assertDictEqual(expected, response_data)
+
+        # fields are checked after authentication
+        response, response_data = self.get_response(
+            url=url_for("api_v1.users_list", fields="bogus"),
+            method="GET",
+        )
+        self.assertEqual(401, response.status_code)
+        self.assertNotIn("fields", response_data["message"])
+
+        # clear db
+        User.query.delete()
+        self.db.session.commit()
+
+    def test_filters_use_indexes(self):
+        cases = (
+            ({}, "ix_users_created_at_id"),
+            ({"is_active": "true"}, "ix_users_is_active_created_at_id"),
+            ({"is_admin": "false"}, "ix_users_is_admin_created_at_id"),
+            (
+                {"created_after": "2000-01-01", "sort": "-created_at"},
+                "ix_users_created_at_id",
+            ),
+        )
+
+        for args, index in cases:
+            args = MultiDict(args)
+            query = apply_filters(
+                User.query,
+                User,
+                UsersListResource.filter_fields,
+                args,
+            )
+            columns, descending = get_ordering(
+                User,
+                UsersListResource.sort_fields,
+                UsersListResource.cursor_fields,
+                args.get("sort"),
+            )
+            query = keyset_filter(query, columns, descending=descending)
+            compiled = query.limit(10).statement.compile(
+                dialect=self.db.engine.dialect,
+            )
+            plan = self.db.engine.execute(
+                f"EXPLAIN QUERY PLAN {compiled}",
+                *[compiled.params[key] for key in compiled.positiontup],
+            ).fetchall()
+            details = " ".join(row[-1] for row in plan)
+
+            self.assertIn(f"USING INDEX {index}", details, args)
+            self.assertNotIn("TEMP B-TREE", details, args)
+
+    def test_stream(self):
+        # add dummy data
+        add_test_users()
+
+        headers = self.get_auth_header(self.login_as_user("user_1"))
+        chunk_size = self.app.config["API_STREAM_CHUNK_SIZE"]
+        self.app.config["API_STREAM_CHUNK_SIZE"] = 2
+
+        # JSON array
+        response = self.client.get(
+            url_for("api_v1.users_list", stream=1),
+            headers=headers,
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(APPLICATION_JSON, response.mimetype)
+        self.assertEqual(
+            ["user_1", "user_2", "user_3"],
+            [item["login"] for item in json.loads(response.data)],
+        )
+
+        # NDJSON after cursor
+        response = self.client.get(
+            url_for("api_v1.users_list", limit=1),
+            headers=headers,
+        )
+        cursor = response.headers.get("X-Next-Cursor")
+        headers["Accept"] = APPLICATION_NDJSON
+        response = self.client.get(
+            url_for("api_v1.users_list", after=cursor),
+            headers=headers,
+        )
+        self.app.config["API_STREAM_CHUNK_SIZE"] = chunk_size
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(APPLICATION_NDJSON, response.mimetype)
+        lines = response.data.decode().splitlines()
+        self.assertEqual(
+            ["user_2", "user_3"],
+            [json.loads(line)["login"] for line in lines],
+        )
+
+        # clear db
+        User.query.delete()
+        self.db.session.commit()
+
+    def test_response_cache(self):
+        # add dummy data
+        add_test_users()
+
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        token = self.login_as_user("user_1")
+        url = url_for("api_v1.users_list", limit=2)
+        self.get_response(url=url, method="GET", token=token)
+
+        event.listen(self.db.engine, "before_cursor_execute", count)
+        try:
+            response, response_data = self.get_response(
+                url=url,
+                method="GET",
+                token=token,
+            )
+        finally:
+            event.remove(self.db.engine, "before_cursor_execute", count)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(2, len(response_data))
+        self.assertFalse(statements, statements)
+        self.assertTrue(response.headers.get("X-Next-Cursor"))
+
+        # cache is dropped after users change
+        self.get_response(
+            url=url_for("api_v1.user_details", resource_id=2),
+            method="PATCH",
+            token=token,
+            payload={"name": "Updated name"},
+        )
+        response, response_data = self.get_response(
+            url=url,
+            method="GET",
+            token=token,
+        )
+        self.assertEqual("Updated name", response_data[1]["name"])
+
+        # response built during concurrent commit isn't stored
+        def commit(*args):
+            clear_response_cache(User)
+
+        url = url_for("api_v1.users_list", limit=3)
+        event.listen(self.db.engine, "before_cursor_execute", commit)
+        try:
+            self.get_response(url=url, method="GET", token=token)
+        finally:
+            event.remove(self.db.engine, "before_cursor_execute", commit)
+
+        statements.clear()
+        event.listen(self.db.engine, "before_cursor_execute", count)
+        try:
+            self.get_response(url=url, method="GET", token=token)
+        finally:
+            event.remove(self.db.engine, "before_cursor_execute", count)
+
+        self.assertTrue(statements)
+
+        # stats logging is disabled by zero interval
+        self.app.config["RESPONSE_CACHE_LOG_INTERVAL"] = 0
+        try:
+            response, response_data = self.get_response(
+                url=url,
+                method="GET",
+                token=token,
+            )
+        finally:
+            self.app.config["RESPONSE_CACHE_LOG_INTERVAL"] = 1000
+
+        self.assertEqual(200, response.status_code)
+
+        # cache is disabled by zero size, stored response isn't used
+        statements.clear()
+        self.app.config["RESPONSE_CACHE_SIZE"] = 0
+        event.listen(self.db.engine, "before_cursor_execute", count)
+        try:
+            self.get_response(url=url, method="GET", token=token)
+        finally:
+            event.remove(self.db.engine, "before_cursor_execute", count)
+            self.app.config["RESPONSE_CACHE_SIZE"] = 256
+
+        self.assertTrue(statements)
+
+        # clear db
+        User.query.delete()
+        self.db.session.commit()
+
+    def test_estimate_size(self):
+        page = [{"id": index, "name": f"User {index}"} for index in range(10)]
+        size = len(json.dumps(page))
+
+        self.assertAlmostEqual(
+            size, UsersListResource.estimate_size(page), delta=size * 0.1,
+        )
+        self.assertEqual(2, UsersListResource.estimate_size({}))
+
+
+class UsersBulkResourceTestCase(ApiTestCase):
+    """ Test users bulk update and delete API. """
+
+    def setUp(self):
+        super().setUp()
+        add_test_users()
+
+        with self.app.app_context():
+            self.url = url_for("api_v1.users_list")
+
+    def tearDown(self):
+        super().tearDown()
+        User.query.delete()
+        self.db.session.commit()
+
+    def test_bulk_update_by_ids(self):
+        response, response_data = self.get_response(
+            method="PATCH",
+            token=self.login_as_user("user_1"),
+            payload={"ids": [2, 3, 20], "data": {"is_active": False}},
+        )
+
+        expected = {
+            "count": 2,
+            "results": [
+                {"id": 2, "status": 200, "message": USER_WAS_UPDATED},
+                {"id": 3, "status": 200, "message": USER_WAS_UPDATED},
+                {"id": 20, "status": 404, "message": USER_NOT_FOUND},
+            ],
+        }
+
+        self.assertEqual(200, response.status_code)
+        self.assertDictEqual(expected, response_data)
+        self.assertEqual(
+            [1],
+            [user.id for user in User.query.filter_by(is_active=True)],
+        )
+
+    def test_bulk_update_validation(self):
+        token = self.login_as_user("user_1")
+
+        for payload in (
+            {"data": {"is_active": False}},
+            {"ids": [2], "filter": {"is_admin": False}, "data": {}},
+            {"ids": [2], "data": {"login": "new_login"}},
+        ):
+            response, response_data = self.get_response(
+                method="PATCH",
+                token=token,
+                payload=payload,
+            )
+            self.assertEqual(400, response.status_code, payload)
+            self.assertIn("message", response_data)
+
+    def test_bulk_delete_by_filter(self):
+        response, response_data = self.get_response(
+            method="DELETE",
+            token=self.login_as_user("user_1"),
+            payload={"filter": {"is_active": True}},
+        )
+
+        expected = {
+            "count": 2,
+            "results": [
+                {
+                    "id": 1,
+                    "status": 400,
+                    "message": DELETE_YOURSELF_VALIDATION,
+                },
+            ],
+        }
+
+        self.assertEqual(200, response.status_code)
+        self.assertDictEqual(expected, response_data)
+        self.assertEqual([1], [user.id for user in User.query.all()])
+
+    def test_bulk_update_by_filter(self):
+        token = self.login_as_user("user_1")
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(self.db.engine, "before_cursor_execute", count)
+        try:
+            response, response_data = self.get_response(
+                method="PATCH",
+                token=token,
+                payload={
+                    "filter": {"is_admin": False},
+                    "data": {"is_active": False},
+                },
+            )
+        finally:
+            event.remove(self.db.engine, "before_cursor_execute", count)
+
+        self.assertEqual(200, response.status_code)
+        self.assertDictEqual({"count": 2, "results": []}, response_data)
+        # filter is applied by UPDATE itself, ids aren't selected
+        self.assertEqual(
+            ["UPDATE"],
+            [statement.split()[0] for statement in statements
+             if "is_admin = " in statement],
+            statements,
+        )
+        self.assertEqual(
+            [1],
+            [user.id for user in User.query.filter_by(is_active=True)],
+        )
+
+    def test_bulk_delete_without_payload(self):
+        response = self.client.delete(
+            self.url,
+            headers=self.get_auth_header(self.login_as_user("user_1")),
+        )
+
+        self.assertEqual(400, response.status_code)
+        self.assertDictEqual(
+            {"message": EMPTY_PAYLOAD},
+            json.loads(response.data),
+        )
+
 
 class UserResourceTestCase(ApiTestCase):
     """ Test users crud API. """
@@ -478,6 +1143,145 @@ class UserResourceTestCase(ApiTestCase):
         self.assertTrue(response_data)
         self.assertDictEqual(expected, response_data)
 
+    def test_deleted_user_token(self):
+        token = self.login_as_user("user_2")
+        User.get_cached(2)
+
+        # deleted by other worker, model cache of this one isn't dropped
+        self.db.session.execute(User.__table__.delete().where(User.id == 2))
+        self.db.session.commit()
+        self.db.session.remove()
+
+        response, response_data = self.get_response(
+            url=url_for("api_v1.current_user_profile"),
+            method="GET",
+            token=token,
+        )
+        self.assertEqual(401, response.status_code)
+
+    def test_write_after_other_worker_delete(self):
+        token = self.login_as_user("user_1")
+        User.get_cached(3)
+
+        # deleted by other worker, model cache of this one isn't dropped
+        self.db.session.execute(User.__table__.delete().where(User.id == 3))
+        self.db.session.commit()
+        self.db.session.remove()
+
+        for method, payload in (("PATCH", {"name": "New Name"}),
+                                ("DELETE", None)):
+            response, response_data = self.get_response(
+                url=url_for("api_v1.user_details", resource_id=3),
+                method=method,
+                payload=payload,
+                token=token,
+            )
+
+            self.assertEqual(200, response.status_code, method)
+            self.assertDictEqual({"message": USER_NOT_FOUND}, response_data)
+
+    def test_conditional_get(self):
+        url = url_for("api_v1.user_details", resource_id=2)
+        headers = self.get_auth_header(self.login_as_user("user_1"))
+
+        response = self.client.get(url, headers=headers)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(etag.startswith("W/"))
+        self.assertTrue(last_modified)
+
+        # fresh client copy
+        response = self.client.get(
+            url,
+            headers=dict(headers, **{"If-None-Match": etag}),
+        )
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(b"", response.data)
+        self.assertEqual(etag, response.headers.get("ETag"))
+
+        response = self.client.get(
+            url,
+            headers=dict(headers, **{"If-Modified-Since": last_modified}),
+        )
+        self.assertEqual(304, response.status_code)
+
+        # other format has other fingerprint
+        response = self.client.get(url, headers=dict(headers, **{
+            "If-None-Match": etag,
+            "Accept": APPLICATION_MSGPACK,
+        }))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(APPLICATION_MSGPACK, response.mimetype)
+        self.assertIn("Accept", response.vary)
+        self.assertNotEqual(etag, response.headers.get("ETag"))
+
+        # list page fingerprint
+        list_url = url_for("api_v1.users_list")
+        response = self.client.get(list_url, headers=headers)
+        list_etag = response.headers.get("ETag")
+        self.assertNotEqual(etag, list_etag)
+
+        response = self.client.get(
+            list_url,
+            headers=dict(headers, **{"If-None-Match": list_etag}),
+        )
+        self.assertEqual(304, response.status_code)
+
+        # cached list response of other format isn't used
+        response = self.client.get(list_url, headers=dict(headers, **{
+            "If-None-Match": list_etag,
+            "Accept": APPLICATION_MSGPACK,
+        }))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(APPLICATION_MSGPACK, response.mimetype)
+
+        # stale client copy after update
+        self.get_response(
+            url=url,
+            method="PATCH",
+            token=self.login_as_user("user_1"),
+            payload={"name": "Updated name"},
+        )
+        response = self.client.get(
+            url,
+            headers=dict(headers, **{"If-None-Match": etag}),
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response.headers.get("ETag"))
+        self.assertEqual("Updated name", json.loads(response.data)["name"])
+
+        response = self.client.get(
+            list_url,
+            headers=dict(headers, **{"If-None-Match": list_etag}),
+        )
+        self.assertEqual(200, response.status_code)
+
+    def test_conditional_get_list_after_delete(self):
+        list_url = url_for("api_v1.users_list")
+        headers = self.get_auth_header(self.login_as_user("user_1"))
+
+        response = self.client.get(list_url, headers=headers)
+        list_etag = response.headers.get("ETag")
+        self.assertIsNone(response.headers.get("Last-Modified"))
+
+        self.get_response(
+            url=url_for("api_v1.user_details", resource_id=3),
+            method="DELETE",
+            token=self.login_as_user("user_1"),
+        )
+
+        for validator in (
+            {"If-None-Match": list_etag},
+            {"If-Modified-Since": http_date(datetime.datetime.utcnow())},
+        ):
+            response = self.client.get(
+                list_url, headers=dict(headers, **validator),
+            )
+            self.assertEqual(200, response.status_code, validator)
+            self.assertEqual(2, len(json.loads(response.data)))
+
     def test_get_with_wrong_id(self):
         expected = {"message": USER_NOT_FOUND}
 
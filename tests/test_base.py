@@ -6,6 +6,7 @@ from apps import db, create_app
 from apps.api.v1 import api_v1_bp
 from apps.config import TestConfig
 from apps.core.constants import AUTHORIZATION_HEADER, APPLICATION_JSON
+from apps.core.models import BaseModel
 from tests.fixtures import get_users
 
 
@@ -35,6 +36,7 @@ class DBTestCase(BaseTestCase):
         cls.db.reflect()
         cls.db.drop_all()
         cls.db.create_all()
+        BaseModel.clear_caches()
 
     @classmethod
     def tearDownClass(cls):
@@ -1,4 +1,12 @@
-from apps.users.commands import create_admin_user
+import csv
+import json
+import os
+import shutil
+import tempfile
+
+from apps.users.commands import (
+    create_admin_user, import_users, seed_users, generate_users,
+)
 from apps.users.models import User
 from tests.test_base import CliTestCase
 
@@ -32,3 +40,168 @@ class TestAddAdminUserCommandCase(CliTestCase):
         self.assertTrue("pbkdf2" in user.password)
         self.assertEqual(self.test_input_data[2], user.name)
         self.assertEqual(self.test_input_data[3], user.email)
+
+
+class TestImportUsersCommandCase(CliTestCase):
+    """ Test app import_users CLI command. """
+
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.rows = [
+            {
+                "login": f"import_{index}",
+                "password": f"pass_{index}",
+                "name": f"Import User {index}",
+                "email": f"import_{index}@powercode.us",
+                "is_active": "true",
+            }
+            for index in range(5)
+        ]
+        # invalid and duplicated rows
+        self.rows.insert(2, dict(self.rows[0], login="bad"))
+        self.rows.append(dict(self.rows[1]))
+
+    def tearDown(self):
+        User.query.delete()
+        self.db.session.commit()
+        shutil.rmtree(self.tmp_dir)
+
+    def write_csv(self, rows):
+        path = os.path.join(self.tmp_dir, "users.csv")
+
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=rows[0].keys())
+            writer.writeheader()
+            writer.writerows(rows)
+
+        return path
+
+    def test_csv_import(self):
+        result = self.runner.invoke(
+            import_users,
+            [self.write_csv(self.rows), "--chunk-size", "2", "--workers", "1"],
+        )
+
+        self.assertEqual(0, result.exit_code, result.output)
+        self.assertIn("Imported 5 users, skipped 2", result.output)
+        self.assertIn("Row 3:", result.output)
+        self.assertEqual(5, User.query.count())
+
+        user = User.query.filter_by(login="import_4").first()
+        self.assertTrue(user.is_active)
+        self.assertFalse(user.is_admin)
+        self.assertTrue(user.check_password("pass_4"))
+
+    def test_ndjson_import_from_checkpoint(self):
+        path = os.path.join(self.tmp_dir, "users.ndjson")
+
+        with open(path, "w") as file:
+            for row in self.rows:
+                file.write(json.dumps(dict(row, is_active=True)) + "\n")
+
+        with open(f"{path}.checkpoint", "w") as file:
+            file.write("3")
+
+        result = self.runner.invoke(import_users, [path, "--workers", "2"])
+
+        self.assertEqual(0, result.exit_code, result.output)
+        self.assertIn("Resuming import from row 4.", result.output)
+        self.assertEqual(
+            ["import_2", "import_3", "import_4", "import_1"],
+            [user.login for user in User.query.order_by(User.id)],
+        )
+        self.assertFalse(os.path.exists(f"{path}.checkpoint"))
+
+    def test_csv_unknown_column(self):
+        path = self.write_csv([dict(row, phone="1") for row in self.rows])
+        result = self.runner.invoke(import_users, [path, "--workers", "1"])
+
+        self.assertEqual(1, result.exit_code, result.output)
+        self.assertIn("File error: Invalid field: phone.", result.output)
+        self.assertEqual(0, User.query.count())
+
+    def test_ndjson_unknown_field(self):
+        path = os.path.join(self.tmp_dir, "users.ndjson")
+        rows = [dict(row, is_active=True) for row in self.rows[:2]]
+        rows[0]["phone"] = "1"
+
+        with open(path, "w") as file:
+            for row in rows:
+                file.write(json.dumps(row) + "\n")
+
+        result = self.runner.invoke(import_users, [path, "--workers", "1"])
+
+        self.assertEqual(0, result.exit_code, result.output)
+        self.assertIn("Row 1: {'_schema': ['Invalid field: phone.']}",
+                      result.output)
+        self.assertIn("Imported 1 users, skipped 1", result.output)
+        self.assertEqual(
+            ["import_1"], [user.login for user in User.query.all()],
+        )
+
+
+class TestSeedUsersCommandCase(CliTestCase):
+    """ Test app seed_users CLI command. """
+
+    def tearDown(self):
+        User.query.delete()
+        self.db.session.commit()
+
+    def get_users(self):
+        return [
+            (user.login, user.email, user.name, user.is_active)
+            for user in User.query.order_by(User.login)
+        ]
+
+    def test_seed(self):
+        result = self.runner.invoke(seed_users, [
+            "--count", "25", "--batch-size", "10", "--workers", "1",
+            "--passwords", "2",
+        ])
+
+        self.assertEqual(0, result.exit_code, result.output)
+        self.assertIn("Inserted 20 of 25 users.", result.output)
+        self.assertIn("Seeded 25 users,", result.output)
+        self.assertIn("rows/s.", result.output)
+        self.assertEqual(25, User.query.count())
+
+        user = User.query.filter(User.login.like("%.7")).first()
+        self.assertIn("@example.", user.email)
+        self.assertFalse(user.is_admin)
+        self.assertTrue(
+            user.check_password("password0")
+            or user.check_password("password1"),
+        )
+
+        # same seed gives same users
+        users = self.get_users()
+        User.query.delete()
+        self.db.session.commit()
+        self.runner.invoke(seed_users, ["--count", "25", "--workers", "1"])
+        self.assertListEqual(users, self.get_users())
+
+        # other seed and next indexes
+        result = self.runner.invoke(seed_users, [
+            "--count", "25", "--seed", "1", "--start", "26",
+            "--workers", "1",
+        ])
+        self.assertEqual(0, result.exit_code, result.output)
+        self.assertEqual(50, User.query.count())
+        self.assertNotEqual(
+            [item["name"] for item in generate_users(0, 1, 26, ["hash"])],
+            [item["name"] for item in generate_users(1, 1, 26, ["hash"])],
+        )
+
+    def test_seed_by_processes(self):
+        result = self.runner.invoke(seed_users, [
+            "--count", "100", "--batch-size", "30", "--workers", "2",
+            "--passwords", "1",
+        ])
+
+        self.assertEqual(0, result.exit_code, result.output)
+        self.assertIn("Seeded 100 users,", result.output)
+        self.assertEqual(100, User.query.count())
+        self.assertEqual(
+            100, self.db.session.query(User.email.distinct()).count(),
+        )
@@ -0,0 +1,105 @@
+import gzip
+
+from flask import url_for, json
+
+from apps import compress
+from apps.core.constants import APPLICATION_NDJSON
+from apps.users.models import User
+from tests.fixtures import add_test_users
+from tests.test_base import ApiTestCase
+
+
+class CompressionTestCase(ApiTestCase):
+    """ Test case for responses compression. """
+
+    def setUp(self):
+        super().setUp()
+        add_test_users()
+        self.headers = self.get_auth_header(self.login_as_user("user_1"))
+        self.headers["Accept-Encoding"] = "gzip"
+        self.min_size = self.app.config["COMPRESS_MIN_SIZE"]
+        self.app.config["COMPRESS_MIN_SIZE"] = 100
+
+    def tearDown(self):
+        self.app.config["COMPRESS_MIN_SIZE"] = self.min_size
+        super().tearDown()
+        User.query.delete()
+        self.db.session.commit()
+
+    def test_compressed_list(self):
+        response = self.client.get(
+            url_for("api_v1.users_list"),
+            headers=self.headers,
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("gzip", response.headers.get("Content-Encoding"))
+        self.assertIn("Accept-Encoding", response.vary)
+        self.assertEqual(
+            ["user_1", "user_2", "user_3"],
+            [item["login"]
+             for item in json.loads(gzip.decompress(response.data))],
+        )
+
+    def test_not_compressed(self):
+        # client doesn't accept compression
+        del self.headers["Accept-Encoding"]
+        response = self.client.get(
+            url_for("api_v1.users_list"),
+            headers=self.headers,
+        )
+        self.assertIsNone(response.headers.get("Content-Encoding"))
+        self.assertEqual(3, len(json.loads(response.data)))
+
+        # response is smaller than threshold
+        self.headers["Accept-Encoding"] = "gzip"
+        self.app.config["COMPRESS_MIN_SIZE"] = 10000
+        response = self.client.get(
+            url_for("api_v1.users_list"),
+            headers=self.headers,
+        )
+        self.assertIsNone(response.headers.get("Content-Encoding"))
+        self.assertEqual(3, len(json.loads(response.data)))
+
+        # gzip is refused
+        self.headers["Accept-Encoding"] = "gzip;q=0"
+        self.app.config["COMPRESS_MIN_SIZE"] = 100
+        response = self.client.get(
+            url_for("api_v1.users_list"),
+            headers=self.headers,
+        )
+        self.assertIsNone(response.headers.get("Content-Encoding"))
+
+    def test_compressed_stream(self):
+        self.headers["Accept"] = APPLICATION_NDJSON
+        response = self.client.get(
+            url_for("api_v1.users_list", stream=1),
+            headers=self.headers,
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("gzip", response.headers.get("Content-Encoding"))
+        self.assertIsNone(response.headers.get("Content-Length"))
+        lines = gzip.decompress(response.data).decode().splitlines()
+        self.assertEqual(
+            ["user_1", "user_2", "user_3"],
+            [json.loads(line)["login"] for line in lines],
+        )
+
+    def test_precompressed_swagger(self):
+        compress.cache.clear()
+        # flasgger is initialized by first docs request
+        url = "/flasgger_static/swagger-ui.css"
+        hits = compress.cache.hits
+
+        for _ in range(2):
+            response = self.client.get(url, headers=self.headers)
+            self.assertEqual(200, response.status_code)
+            self.assertEqual(
+                "gzip", response.headers.get("Content-Encoding"),
+            )
+            self.assertIn(b"swagger-ui", gzip.decompress(response.data))
+            response.close()
+
+        self.assertEqual(1, compress.cache.hits - hits)
+        self.assertEqual(1, len(compress.cache))
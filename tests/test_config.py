@@ -1,6 +1,11 @@
+import json
 import os
+import subprocess
+import sys
 import unittest
 
+from dotenv import dotenv_values
+
 from apps import create_app
 from apps.config import (
     ProdConfig, TestConfig, Config, DevConfig, PROJECT_DIR,
@@ -127,3 +132,25 @@ class TestAppConfigCase(unittest.TestCase):
             self.app.config["SERVER_NAME"],
             os.getenv("TEST_SERVER_NAME", "127.0.0.1"),
         )
+
+    def test_empty_env_values(self):
+        """ Test .env copied from .env.example gives default values. """
+
+        env = dict(os.environ, **{
+            key: "" for key in
+            dotenv_values(os.path.join(PROJECT_DIR, ".env.example"))
+        })
+        output = subprocess.check_output(
+            [sys.executable, "-c",
+             "import json; from apps.config import ProdConfig as c; print("
+             "json.dumps([c.MODEL_CACHE_SIZE, c.MODEL_CACHE_LOG_INTERVAL, "
+             "c.RESPONSE_CACHE_LOG_INTERVAL, "
+             "c.COMPRESS_ENABLED, c.METRICS_ENABLED, c.QUERY_STATS_ENABLED, "
+             "c.LOG_SAMPLE_RATE, c.DATABASE_CONCURRENCY]))"],
+            cwd=PROJECT_DIR,
+            env=env,
+        )
+
+        self.assertListEqual(
+            [1024, 1000, 1000, True, True, True, 1.0, 20], json.loads(output),
+        )
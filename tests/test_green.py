@@ -0,0 +1,71 @@
+import os
+import time
+import unittest
+
+import gevent
+from sqlalchemy import create_engine
+
+from apps.core.green import make_psycopg2_green
+from tests.test_base import BaseTestCase
+
+POSTGRES_URI = os.getenv("TEST_POSTGRES_URI")
+SLOW_QUERIES = 5
+SLOW_QUERY_SECONDS = 0.5
+
+
+class GreenSessionTestCase(BaseTestCase):
+    """ Test case for session scoped by greenlet. """
+
+    def test_session_per_greenlet(self):
+        def get_sessions():
+            with self.app.app_context():
+                return self.db.session(), self.db.session()
+
+        first, second = gevent.spawn(get_sessions), gevent.spawn(get_sessions)
+        gevent.joinall([first, second])
+
+        self.assertIs(first.value[0], first.value[1])
+        self.assertIsNot(first.value[0], second.value[0])
+
+        for greenlet in (first, second):
+            greenlet.value[0].close()
+
+
+@unittest.skipUnless(POSTGRES_URI, "TEST_POSTGRES_URI is not set")
+class GreenPsycopg2TestCase(unittest.TestCase):
+    """ Test case for psycopg2 queries cooperating under gevent. """
+
+    def setUp(self):
+        from psycopg2 import extensions
+
+        make_psycopg2_green()
+        self.addCleanup(extensions.set_wait_callback, None)
+        self.engine = create_engine(
+            POSTGRES_URI, pool_size=SLOW_QUERIES + 1, max_overflow=0,
+        )
+        self.addCleanup(self.engine.dispose)
+
+    def test_slow_queries_dont_block_others(self):
+        def slow_query():
+            with self.engine.connect() as connection:
+                connection.execute(
+                    f"SELECT pg_sleep({SLOW_QUERY_SECONDS})",
+                )
+
+        def fast_query():
+            gevent.sleep(0.05)
+            started = time.monotonic()
+            with self.engine.connect() as connection:
+                connection.execute("SELECT 1")
+            return time.monotonic() - started
+
+        started = time.monotonic()
+        greenlets = [gevent.spawn(slow_query) for _ in range(SLOW_QUERIES)]
+        fast = gevent.spawn(fast_query)
+        gevent.joinall(greenlets + [fast], raise_error=True)
+        elapsed = time.monotonic() - started
+
+        # slow queries run concurrently instead of one after another
+        self.assertLess(elapsed, SLOW_QUERY_SECONDS * 2)
+        # unrelated query doesn't wait for slow ones
+        self.assertLess(fast.value, SLOW_QUERY_SECONDS / 2)
@@ -0,0 +1,188 @@
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from flask import Flask, json
+
+from apps.config import TestConfig, PROJECT_DIR
+from apps.core.queries import SLOW_QUERY_LOGGER
+from apps.logs import (
+    setup_logs, stop_listener, start_listeners, stop_listeners,
+    make_log_queue, set_request_id, DroppingQueueHandler, SamplingFilter,
+    REQUEST_ID_HEADER,
+)
+
+# slow handler must not block gevent hub, i.e. run in native thread
+NATIVE_THREAD_CODE = """
+from gevent import monkey; monkey.patch_all()
+import json, logging, time, gevent
+from apps.logs import NativeQueueListener, DroppingQueueHandler, make_log_queue
+get_ident = monkey.get_original("_thread", "get_ident")
+sleep = monkey.get_original("time", "sleep")
+
+class SlowHandler(logging.Handler):
+    def emit(self, record):
+        self.ident = get_ident()
+        sleep(0.5)
+
+handler = SlowHandler()
+queue_handler = DroppingQueueHandler(make_log_queue())
+listener = NativeQueueListener(queue_handler.queue, handler)
+listener.start()
+logger = logging.getLogger("native")
+logger.addHandler(queue_handler)
+logger.warning("Slow record")
+started = time.perf_counter()
+for _ in range(10):
+    gevent.sleep(0.01)
+elapsed = time.perf_counter() - started
+listener.stop()
+print(json.dumps([handler.ident != get_ident(), elapsed < 0.4]))
+"""
+
+
+class LogsTestCase(unittest.TestCase):
+    """ Test case for queued JSON logging. """
+
+    def setUp(self):
+        self.logdir = tempfile.TemporaryDirectory()
+        self.app = Flask(__name__)
+        self.app.config.from_object(TestConfig)
+        self.app.config.update(
+            APP_LOGDIR=self.logdir.name,
+            APP_LOGFILE=os.path.join(self.logdir.name, "app.log"),
+        )
+        # setup_logs adds app handler to global slow queries logger
+        self.slow_query_handlers = list(
+            logging.getLogger(SLOW_QUERY_LOGGER).handlers,
+        )
+
+    def tearDown(self):
+        logging.getLogger(SLOW_QUERY_LOGGER).handlers = \
+            self.slow_query_handlers
+        self.logdir.cleanup()
+
+    def test_json_lines(self):
+        listeners = setup_logs(self.app)
+
+        @self.app.route("/")
+        def index():
+            self.app.logger.info("Index %s", "requested")
+            return "ok"
+
+        response = self.app.test_client().get(
+            "/", headers={REQUEST_ID_HEADER: "request-1"},
+        )
+
+        for listener in listeners:
+            stop_listener(listener)
+
+        with open(self.app.config["APP_LOGFILE"]) as file:
+            record = json.loads(file.readline())
+
+        self.assertEqual("request-1", response.headers[REQUEST_ID_HEADER])
+        self.assertEqual("Index requested", record["message"])
+        self.assertEqual("INFO", record["level"])
+        self.assertEqual("request-1", record["request_id"])
+        self.assertEqual("/", record["path"])
+        self.assertIn("latency_ms", record)
+
+    def test_slow_query_to_app_log(self):
+        listeners = setup_logs(self.app)
+        logger = logging.getLogger(SLOW_QUERY_LOGGER)
+
+        with self.app.test_request_context("/"):
+            set_request_id()
+            logger.warning("Slow query")
+
+        for listener in listeners:
+            stop_listener(listener)
+
+        with open(self.app.config["APP_LOGFILE"]) as file:
+            record = json.loads(file.readline())
+
+        self.assertEqual(SLOW_QUERY_LOGGER, record["logger"])
+        self.assertEqual("Slow query", record["message"])
+        self.assertIn("request_id", record)
+
+    def test_forked_worker(self):
+        listeners = setup_logs(self.app)
+        self.app.logger.warning("Master record")
+        pid = os.fork()
+
+        if not pid:
+            # worker writes by new listener and queue to the same file
+            status = 1
+            try:
+                worker_listeners = start_listeners(self.app)
+                self.app.logger.warning("Worker record")
+                stop_listeners(self.app)
+                status = int(bool(set(worker_listeners) & set(listeners)))
+            finally:
+                os._exit(status)
+
+        _, status = os.waitpid(pid, 0)
+        self.app.logger.warning("Master record after fork")
+        stop_listeners(self.app)
+
+        with open(self.app.config["APP_LOGFILE"]) as file:
+            messages = [json.loads(line)["message"] for line in file]
+
+        self.assertEqual(0, status)
+        self.assertCountEqual(
+            ["Master record", "Worker record", "Master record after fork"],
+            messages,
+        )
+
+    def test_exception(self):
+        listeners = setup_logs(self.app)
+
+        try:
+            raise ValueError("Invalid value")
+        except ValueError:
+            self.app.logger.exception("Failed %s", "request")
+
+        for listener in listeners:
+            stop_listener(listener)
+
+        with open(self.app.config["APP_LOGFILE"]) as file:
+            record = json.loads(file.readline())
+
+        self.assertEqual("Failed request", record["message"])
+        self.assertIn("ValueError: Invalid value", record["exc_info"])
+
+    def test_native_thread(self):
+        output = subprocess.check_output(
+            [sys.executable, "-c", NATIVE_THREAD_CODE],
+            cwd=PROJECT_DIR,
+            timeout=10,
+        )
+
+        self.assertListEqual([True, True], json.loads(output))
+
+    def test_drop_overflow(self):
+        handler = DroppingQueueHandler(make_log_queue(), 1)
+        logger = logging.getLogger("tests.drop_overflow")
+        logger.propagate = False
+        logger.addHandler(handler)
+
+        for index in range(3):
+            logger.warning("Record %s", index)
+
+        self.assertEqual(2, handler.dropped)
+
+        handler.queue.get_nowait()
+        logger.warning("Record after drop")
+        self.assertEqual(2, handler.queue.get_nowait().dropped)
+
+    def test_sampling(self):
+        sampling = SamplingFilter(0)
+        info = logging.makeLogRecord({"levelno": logging.INFO})
+        error = logging.makeLogRecord({"levelno": logging.ERROR})
+
+        self.assertFalse(sampling.filter(info))
+        self.assertTrue(sampling.filter(error))
+        self.assertTrue(SamplingFilter(1).filter(info))
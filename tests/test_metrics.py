@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+from flask import url_for
+
+from apps.config import PROJECT_DIR
+from apps.core.metrics import MULTIPROCESS_DIR_ENV
+from tests.test_base import BaseTestCase
+
+# worker process sends requests and prints metrics of all workers
+WORKER_CODE = """
+import sys
+from apps import create_app
+from apps.config import TestConfig
+client = create_app(TestConfig).test_client()
+for _ in range(int(sys.argv[1])):
+    client.get("/api/v1/users/")
+print(client.get("/metrics").data.decode())
+"""
+
+
+class MetricsTestCase(BaseTestCase):
+    """ Test case for requests metrics endpoint. """
+
+    def get_metrics(self):
+        with self.app.app_context():
+            response = self.client.get(url_for("metrics"))
+
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.mimetype.startswith("text/plain"))
+        return response.data.decode()
+
+    def get_sample(self, metrics, name, labels):
+        prefix = f"{name}{{{labels}}} "
+
+        for line in metrics.splitlines():
+            if line.startswith(prefix):
+                return float(line[len(prefix):])
+
+        return 0.0
+
+    def test_request_metrics(self):
+        labels = 'endpoint="/api/v1/users/",method="GET",status="401"'
+        before = self.get_metrics()
+
+        with self.app.app_context():
+            response = self.client.get(url_for("api_v1.users_list"))
+        self.assertEqual(401, response.status_code)
+
+        after = self.get_metrics()
+
+        self.assertEqual(1, (
+            self.get_sample(after, "http_request_duration_seconds_count",
+                            labels)
+            - self.get_sample(before, "http_request_duration_seconds_count",
+                              labels)
+        ))
+        self.assertEqual(len(response.data), (
+            self.get_sample(after, "http_response_size_bytes_total", labels)
+            - self.get_sample(before, "http_response_size_bytes_total",
+                              labels)
+        ))
+        # metrics request itself is in progress
+        self.assertEqual(1, self.get_sample(
+            after,
+            "http_requests_in_progress",
+            'endpoint="/metrics",method="GET"',
+        ))
+
+    def test_multiprocess_metrics(self):
+        labels = 'endpoint="/api/v1/users/",method="GET",status="401"'
+
+        with tempfile.TemporaryDirectory() as metrics_dir:
+            env = dict(os.environ, **{MULTIPROCESS_DIR_ENV: metrics_dir})
+
+            for count in (2, 3):
+                metrics = subprocess.check_output(
+                    [sys.executable, "-c", WORKER_CODE, str(count)],
+                    cwd=PROJECT_DIR,
+                    env=env,
+                    universal_newlines=True,
+                )
+
+        self.assertEqual(5, self.get_sample(
+            metrics, "http_request_duration_seconds_count", labels,
+        ))
@@ -0,0 +1,124 @@
+import time
+import unittest
+
+from apps.core.cache import LRUCache
+from apps.users.models import User
+from tests.fixtures import add_test_users
+from tests.test_base import DBTestCase
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    """ Test LRU cache store. """
+
+    def test_eviction(self):
+        cache = LRUCache(maxsize=2, ttl=60)
+        cache.set(1, "a")
+        cache.set(2, "b")
+
+        # mark first key as recently used
+        self.assertEqual("a", cache.get(1))
+        cache.set(3, "c")
+
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get(2))
+        self.assertEqual("c", cache.get(3))
+        self.assertDictEqual(
+            {
+                "hits": 2,
+                "misses": 1,
+                "evictions": 1,
+                "size": 2,
+                "maxsize": 2,
+                "bytes": 2,
+            },
+            cache.stats,
+        )
+
+    def test_max_bytes(self):
+        cache = LRUCache(maxsize=10, ttl=60, maxbytes=10)
+        cache.set(1, "a", size=4)
+        cache.set(2, "b", size=4)
+        cache.set(3, "c", size=4)
+
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(8, cache.stats["bytes"])
+
+        # entry bigger than cache isn't stored
+        cache.set(4, "d", size=11)
+        self.assertIsNone(cache.get(4))
+        self.assertEqual(2, len(cache))
+
+    def test_ttl(self):
+        cache = LRUCache(maxsize=2, ttl=0.01)
+        cache.set(1, "a")
+        time.sleep(0.02)
+
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(0, len(cache))
+
+    def test_generation(self):
+        cache = LRUCache(maxsize=2, ttl=60)
+        generation = cache.generation
+        cache.set(1, "a", generation=generation)
+
+        # value built before clear isn't stored
+        cache.clear()
+        cache.set(2, "b", generation=generation)
+
+        self.assertIsNone(cache.get(2))
+        cache.set(2, "b", generation=cache.generation)
+        self.assertEqual("b", cache.get(2))
+
+
+class ModelCacheTestCase(DBTestCase):
+    """ Test BaseModel read-through cache. """
+
+    def setUp(self):
+        super().setUp()
+        add_test_users()
+        User.clear_caches()
+
+    def tearDown(self):
+        User.query.delete()
+        self.db.session.commit()
+
+    def test_get_cached(self):
+        stats = User.get_cache_stats()
+        user = User.get_cached(1)
+        self.assertEqual("user_1", user.login)
+        self.assertEqual(stats["misses"] + 1, User.get_cache_stats()["misses"])
+
+        self.db.session.remove()
+        user = User.get_cached(1)
+        self.assertEqual("user_1", user.login)
+        self.assertTrue(user.check_password("pass1"))
+        self.assertEqual(stats["hits"] + 1, User.get_cache_stats()["hits"])
+
+        # cached instance is attached to session and can be updated
+        user.update({"name": "Cached User"})
+        self.db.session.remove()
+        self.assertEqual("Cached User", User.get_cached(1).name)
+        self.assertEqual("Cached User", User.query.get(1).name)
+
+    def test_stats_log(self):
+        self.app.config["MODEL_CACHE_LOG_INTERVAL"] = 1
+
+        try:
+            with self.assertLogs(self.app.logger, "INFO") as logs:
+                User.get_cached(1)
+        finally:
+            self.app.config["MODEL_CACHE_LOG_INTERVAL"] = 1000
+
+        self.assertIn("Model cache of User", logs.output[0])
+        self.assertIn("'misses'", logs.output[0])
+
+    def test_invalidation(self):
+        self.assertIsNone(User.get_cached(20))
+
+        User.get_cached(2).delete()
+        self.assertIsNone(User.get_cached(2))
+
+        User.get_cached(3)
+        User.query.filter_by(id=3).update({"name": "Bulk Updated"})
+        self.db.session.commit()
+        self.assertEqual("Bulk Updated", User.get_cached(3).name)
@@ -0,0 +1,59 @@
+from flask import url_for, Response
+
+from apps.core.queries import (
+    QueryStats, QueryTracker, get_query_stats, SLOW_QUERY_LOGGER,
+)
+from apps.users.models import User
+from tests.test_base import ApiTestCase
+
+
+class QueryStatsTestCase(ApiTestCase):
+    """ Test case for per request SQL statements stats. """
+
+    def test_repeated_statements(self):
+        stats = QueryStats()
+        stats.add("SELECT 1", 0.1)
+        stats.add("SELECT 2", 0.1)
+        stats.add("SELECT 1", 0.2)
+
+        self.assertEqual(3, stats.count)
+        self.assertAlmostEqual(0.4, stats.duration)
+        self.assertDictEqual({"SELECT 1": 2}, stats.get_repeated(2))
+
+    def test_stats_per_request(self):
+        # requests share app context pushed by test case
+        for _ in range(2):
+            with self.app.test_request_context("/api/v1/users/"):
+                User.query.get(1)
+                self.assertEqual(1, get_query_stats().count)
+
+    def test_response_headers(self):
+        with self.app.app_context():
+            response = self.client.get(
+                url_for("api_v1.user_login"),
+                headers=self.get_auth_header("token"),
+            )
+
+        self.assertIn("X-DB-Statements", response.headers)
+        self.assertIn("X-DB-Time", response.headers)
+        self.assertEqual("0", response.headers["X-DB-Repeated-Statements"])
+
+    def test_n_plus_one_and_slow_query_log(self):
+        threshold = self.app.config["SLOW_QUERY_THRESHOLD_MS"]
+        self.app.config["SLOW_QUERY_THRESHOLD_MS"] = 1e-6
+
+        with self.app.test_request_context("/api/v1/users/"):
+            with self.assertLogs(SLOW_QUERY_LOGGER, "WARNING") as logs:
+                for resource_id in range(5):
+                    User.query.get(resource_id + 1)
+
+            self.assertEqual(5, len(logs.output))
+            self.assertEqual(5, get_query_stats().count)
+
+            with self.assertLogs(self.app.logger, "WARNING") as logs:
+                response = QueryTracker.after_request(Response())
+
+        self.app.config["SLOW_QUERY_THRESHOLD_MS"] = threshold
+        self.assertIn("Possible N+1", logs.output[0])
+        self.assertEqual("5", response.headers["X-DB-Statements"])
+        self.assertEqual("1", response.headers["X-DB-Repeated-Statements"])
@@ -0,0 +1,91 @@
+import gzip
+import hashlib
+import os
+import tempfile
+
+from flask import json, request
+
+from apps import create_app
+from apps.config import TestConfig
+from apps.core.spec import get_spec_file
+from tests.test_base import BaseTestCase
+
+
+class SpecTestCase(BaseTestCase):
+    """ Test case for precomputed OpenAPI spec. """
+
+    def setUp(self):
+        super().setUp()
+        self.spec_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.spec_dir.cleanup)
+        self.config = type("SpecConfig", (TestConfig,), {
+            "SPEC_PRECOMPUTED": True,
+            "SPEC_DIR": self.spec_dir.name,
+        })
+
+    def build_spec(self):
+        app = create_app(self.config)
+        result = app.test_cli_runner().invoke(args=["spec", "build"])
+        self.assertEqual(0, result.exit_code, result.output)
+
+        with open(get_spec_file(app), "rb") as file:
+            return file.read()
+
+    def test_build(self):
+        data = self.build_spec()
+        spec = json.loads(data)
+
+        self.assertTrue(
+            get_spec_file(self.app).endswith(
+                f"apispec_v{self.app.config['API_VERSION']}.json",
+            ),
+        )
+        self.assertIn("/api/v1/users/", spec["paths"])
+        self.assertIn("UserSchema", spec["definitions"])
+
+    @staticmethod
+    def get_spec_endpoint(app):
+        with app.test_request_context("/apispec_1.json"):
+            return request.url_rule.endpoint
+
+    def test_serve_from_memory(self):
+        data = self.build_spec()
+        etag = hashlib.sha256(data).hexdigest()
+        app = create_app(self.config)
+        client = app.test_client()
+
+        response = client.get("/apispec_1.json")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(data, response.data)
+        self.assertEqual((etag, False), response.get_etag())
+        self.assertTrue(response.cache_control.public)
+        self.assertEqual(
+            app.config["SPEC_MAX_AGE"], response.cache_control.max_age,
+        )
+        # introspection view isn't used
+        self.assertEqual("apispec", self.get_spec_endpoint(app))
+
+        response = client.get(
+            "/apispec_1.json", headers={"If-None-Match": f'"{etag}"'},
+        )
+        self.assertEqual(304, response.status_code)
+
+        # compressed response has weak ETag
+        response = client.get(
+            "/apispec_1.json", headers={"Accept-Encoding": "gzip"},
+        )
+        self.assertEqual(data, gzip.decompress(response.data))
+        self.assertEqual((etag, True), response.get_etag())
+        response = client.get("/apispec_1.json", headers={
+            "Accept-Encoding": "gzip",
+            "If-None-Match": f'W/"{etag}"',
+        })
+        self.assertEqual(304, response.status_code)
+
+    def test_not_built(self):
+        app = create_app(self.config)
+        self.assertFalse(os.path.exists(get_spec_file(app)))
+
+        response = app.test_client().get("/apispec_1.json")
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("flasgger.apispec_1", self.get_spec_endpoint(app))
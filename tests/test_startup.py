@@ -0,0 +1,73 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from apps import create_app
+from apps.config import TestConfig, PROJECT_DIR
+from apps.core.startup import PROFILE_CODE, parse_importtime
+
+# cold start budget of `import apps` and create_app(ProdConfig), seconds
+STARTUP_BUDGET = 1.5
+LAZY_CHECK_CODE = (
+    "import sys; from apps import create_app; "
+    "from apps.config import ProdConfig; app = create_app(ProdConfig); "
+    "print('flask_migrate' in sys.modules)"
+)
+
+
+class StartupTestCase(unittest.TestCase):
+    """ Test case for app cold start. """
+
+    def run_python(self, *args):
+        with tempfile.TemporaryDirectory() as logdir:
+            process = subprocess.run(
+                [sys.executable, *args],
+                cwd=PROJECT_DIR,
+                env=dict(os.environ, APP_LOGDIR=logdir),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                universal_newlines=True,
+            )
+
+        self.assertEqual(0, process.returncode, process.stderr)
+        return process
+
+    def test_cold_start_budget(self):
+        report = json.loads(
+            self.run_python("-c", PROFILE_CODE, "production").stdout,
+        )
+
+        self.assertLess(
+            report["import"] + report["create_app"],
+            STARTUP_BUDGET,
+            report,
+        )
+
+    def test_lazy_subsystems(self):
+        self.assertEqual(
+            "False",
+            self.run_python("-c", LAZY_CHECK_CODE).stdout.strip(),
+        )
+
+    def test_swagger_docs(self):
+        app = create_app(TestConfig)
+        client = app.test_client()
+
+        self.assertEqual(200, client.get("/apispec_1.json").status_code)
+        self.assertEqual(200, client.get("/apidocs/").status_code)
+        self.assertEqual(404, client.get("/apidocs/missing").status_code)
+
+    def test_parse_importtime(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       100 |        100 |   flask.json\n"
+            "import time:       200 |        300 | flask\n"
+        )
+
+        self.assertEqual(
+            [("flask", 200, 300), ("flask.json", 100, 100)],
+            parse_importtime(output, 2),
+        )
@@ -0,0 +1,206 @@
+import datetime
+import os
+import tempfile
+import threading
+
+from flask import json, url_for
+from werkzeug.serving import make_server
+
+from apps import create_app
+from apps.config import TestConfig
+from apps.core.constants import APPLICATION_JSON
+from apps.core.pagination import encode_cursor
+from apps.core.traffic import (
+    get_shape, get_arg_shape, build_value, build_arg, build_requests,
+)
+from apps.logs import stop_listeners
+from apps.users.models import User
+from tests.fixtures import add_test_users
+from tests.test_base import ApiTestCase
+
+
+class TrafficTestCase(ApiTestCase):
+    """ Test case for traffic recorder and replay command. """
+
+    def setUp(self):
+        super().setUp()
+        add_test_users()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "traffic.jsonl")
+
+    def tearDown(self):
+        super().tearDown()
+        User.query.delete()
+        self.db.session.commit()
+
+    def record(self):
+        """ Send requests to app with recorder, return records. """
+
+        app = create_app(type("RecordConfig", (TestConfig,), {
+            "TRAFFIC_RECORD_FILE": self.path,
+        }))
+        client = app.test_client()
+        token = self.login_as_user("user_1")
+
+        with app.app_context():
+            client.get(
+                url_for(
+                    "api_v1.users_list",
+                    limit=2,
+                    token="secret",
+                    is_active="true",
+                    created_after="2000-01-01",
+                    after=encode_cursor([datetime.datetime(2000, 1, 1), 1]),
+                ),
+                headers=self.get_auth_header(token),
+            )
+            client.get(
+                url_for("api_v1.current_user_profile"),
+                headers=self.get_auth_header(token),
+            )
+            client.post(
+                url_for("api_v1.user_registration"),
+                data=json.dumps({
+                    "login": "user_4",
+                    "password": "pass4",
+                    "name": "Test User 4",
+                    "email": "user_4@powercode.us",
+                    "is_active": True,
+                }),
+                content_type=APPLICATION_JSON,
+            )
+            client.post(
+                url_for("api_v1.user_login"),
+                data=json.dumps({"login": "user_2", "password": "pass2"}),
+                content_type=APPLICATION_JSON,
+            )
+
+        stop_listeners(app)
+
+        with open(self.path) as file:
+            content = file.read()
+
+        return content, [json.loads(line) for line in content.splitlines()]
+
+    def test_shape(self):
+        shape = get_shape({"ids": [1, 2], "data": {"name": "a"}, "x": None})
+
+        self.assertDictEqual(
+            {"ids": ["int"], "data": {"name": "str"}, "x": "null"}, shape,
+        )
+        self.assertDictEqual(
+            {"ids": [3], "data": {"name": "replay_name_3"}, "x": None},
+            build_value(shape, "", 3),
+        )
+
+    def test_record(self):
+        content, records = self.record()
+        users_list, profile, registration, login = records
+
+        # values aren't recorded
+        for value in ("secret", "pass4", "user_4", "Test User 4", "pass2"):
+            self.assertNotIn(value, content)
+
+        self.assertEqual("GET", users_list["method"])
+        self.assertEqual("/api/v1/users/", users_list["path"])
+        self.assertDictEqual({"limit": "2"}, users_list["query"])
+        self.assertDictEqual(
+            {
+                "token": "str",
+                "is_active": "bool",
+                "created_after": "datetime",
+                "after": {"cursor": ["datetime", "int"]},
+            },
+            users_list["query_shape"],
+        )
+        self.assertEqual(200, users_list["status"])
+        self.assertEqual(12, len(users_list["auth"]))
+        self.assertEqual(users_list["auth"], profile["auth"])
+        self.assertIsNone(registration["auth"])
+        self.assertDictEqual(
+            {"json": {
+                "login": "str",
+                "password": "str",
+                "name": "str",
+                "email": "str",
+                "is_active": "bool",
+            }},
+            registration["body"],
+        )
+        self.assertEqual(201, registration["status"])
+        self.assertEqual(200, login["status"])
+
+    def test_arg_shape(self):
+        cursor = encode_cursor(["2020-01-01T00:00:00.000000", 3])
+        shape = get_arg_shape(cursor)
+
+        self.assertEqual("bool", get_arg_shape("False"))
+        self.assertEqual("int", get_arg_shape("10"))
+        self.assertEqual("datetime", get_arg_shape("2020-01-01T10:00:00"))
+        self.assertEqual("str", get_arg_shape("user_1"))
+        self.assertDictEqual({"cursor": ["datetime", "int"]}, shape)
+        self.assertEqual("true", build_arg("bool", "is_active", 2))
+        self.assertEqual(
+            "2020-01-01T00:00:02", build_arg("datetime", "created_after", 2),
+        )
+        self.assertEqual(
+            encode_cursor(["2020-01-01T00:00:02.000000", 2]),
+            build_arg(shape, "after", 2),
+        )
+
+    def test_build_query(self):
+        record = {
+            "method": "GET",
+            "path": "/api/v1/users/",
+            "query": {"limit": "2"},
+            "query_shape": {"login": "str", "id": "int"},
+        }
+
+        login = {
+            "method": "POST",
+            "path": "/api/v1/users/login/",
+            "body": {"json": {"login": "str", "password": "str"}},
+        }
+        credentials = [{"login": "user_1", "password": "pass1"}]
+
+        (_, url, _, _), (_, _, body, _) = build_requests(
+            [record, login], {}, "JWT", login["path"], credentials,
+        )
+
+        self.assertEqual(
+            "/api/v1/users/?limit=2&login=replay_login_0&id=0", url,
+        )
+        self.assertDictEqual(credentials[0], json.loads(body))
+
+    def test_replay(self):
+        self.record()
+
+        # url host doesn't match test SERVER_NAME
+        app = create_app(type("ServerConfig", (TestConfig,), {
+            "SERVER_NAME": None,
+        }))
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+
+        try:
+            result = self.app.test_cli_runner().invoke(args=[
+                "loadtest", "replay", self.path,
+                "--concurrency", "2",
+                "--url", f"http://127.0.0.1:{server.server_port}",
+                "--login-password", "pass1",
+            ])
+        finally:
+            server.shutdown()
+            thread.join()
+
+        self.assertEqual(0, result.exit_code, result.output)
+        self.assertIn("Requests: 4, concurrency: 2", result.output)
+        self.assertIn("Throughput:", result.output)
+        self.assertIn("Latency ms: p50", result.output)
+        self.assertIn("Errors: 0 (0.0%)", result.output)
+        self.assertIn("200: 3, 201: 1", result.output)
+        self.assertEqual(
+            1, User.query.filter(User.login.like("replay_%")).count(),
+        )